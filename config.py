@@ -3,15 +3,23 @@ XYS Sign Service Configuration
 """
 
 import os
+from functools import cached_property, lru_cache
 from pathlib import Path
-from typing import Optional
-from pydantic_settings import BaseSettings
+from typing import Any, Dict, Optional
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field
 
 
 class XYSServiceConfig(BaseSettings):
     """Configuration for XYS Sign Service"""
 
+    model_config = SettingsConfigDict(
+        env_prefix="XYS_",
+        env_file=".env",
+        env_file_encoding="utf-8",
+        frozen=True,
+    )
+
     # Server settings
     host: str = Field(default="0.0.0.0", description="Server host")
     port: int = Field(default=8080, description="Server port")
@@ -19,6 +27,11 @@ class XYSServiceConfig(BaseSettings):
     # Instance pool settings
     max_instances: int = Field(default=5, description="Maximum browser instances")
     min_instances: int = Field(default=2, description="Minimum browser instances")
+    sign_pages: int = Field(default=2, description="Signing pages per browser instance")
+    lazy_instances: bool = Field(
+        default=False,
+        description="Launch each browser on its first signing request"
+    )
 
     # Browser settings
     headless: bool = Field(default=True, description="Run browser in headless mode")
@@ -51,12 +64,7 @@ class XYSServiceConfig(BaseSettings):
         description="Browser user data directory"
     )
 
-    class Config:
-        env_prefix = "XYS_"
-        env_file = ".env"
-        env_file_encoding = "utf-8"
-
-    @property
+    @cached_property
     def proxy_config(self) -> Optional[dict]:
         """Get proxy configuration dict"""
         if not self.proxy_server:
@@ -70,7 +78,7 @@ class XYSServiceConfig(BaseSettings):
 
         return config
 
-    @property
+    @cached_property
     def default_browser_data_dir(self) -> Path:
         """Get default browser data directory"""
         if self.browser_data_dir:
@@ -79,7 +87,7 @@ class XYSServiceConfig(BaseSettings):
         base_dir = Path(__file__).parent
         return base_dir / "browser_data"
 
-    @property
+    @cached_property
     def default_browser_executable(self) -> Optional[str]:
         """Get default browser executable path"""
         if self.browser_executable:
@@ -98,20 +106,19 @@ class XYSServiceConfig(BaseSettings):
         return None
 
 
-# Global config instance
-_config: Optional[XYSServiceConfig] = None
+# Keyword overrides applied by init_config (e.g. from command line arguments)
+_config_overrides: Dict[str, Any] = {}
 
 
+@lru_cache(maxsize=1)
 def get_config() -> XYSServiceConfig:
     """Get the global config instance"""
-    global _config
-    if _config is None:
-        _config = XYSServiceConfig()
-    return _config
+    return XYSServiceConfig(**_config_overrides)
 
 
 def init_config(**kwargs) -> XYSServiceConfig:
     """Initialize config with custom values"""
-    global _config
-    _config = XYSServiceConfig(**kwargs)
-    return _config
+    global _config_overrides
+    _config_overrides = kwargs
+    get_config.cache_clear()
+    return get_config()
@@ -5,24 +5,26 @@ FastAPI-based HTTP server for XYS signature generation.
 """
 
 import asyncio
+import logging
 import signal
 import sys
+import time
 from contextlib import asynccontextmanager
-from typing import Optional, Dict
+from typing import Any, Awaitable, Callable, Optional, Dict, List
 
+import orjson
 import structlog
 import uvicorn
-from fastapi import FastAPI, HTTPException, status
+from fastapi import FastAPI, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import BaseModel, ConfigDict, Field
 
 from xys_manager import (
     XYSSignManager,
-    get_xys_manager,
     init_xys_manager,
     shutdown_xys_manager,
 )
-from xys_service import InstanceStatus
 from config import get_config, init_config
 from exceptions import (
     XYSSignServiceError,
@@ -30,7 +32,19 @@ from exceptions import (
     SignatureGenerationError,
 )
 
-# Configure structlog
+
+def _orjson_dumps(obj: Any, **kwargs) -> str:
+    """JSONRenderer serializer backed by orjson (stdlib loggers expect str)."""
+    return orjson.dumps(obj, **kwargs).decode()
+
+
+# Configure structlog - pretty console output on a terminal, JSON lines otherwise
+_log_renderer = (
+    structlog.dev.ConsoleRenderer()
+    if sys.stderr.isatty()
+    else structlog.processors.JSONRenderer(serializer=_orjson_dumps)
+)
+
 structlog.configure(
     processors=[
         structlog.stdlib.filter_by_level,
@@ -38,12 +52,14 @@ structlog.configure(
         structlog.stdlib.add_log_level,
         structlog.stdlib.PositionalArgumentsFormatter(),
         structlog.processors.TimeStamper(fmt="iso"),
-        structlog.processors.StackInfoRenderer(),
         structlog.processors.format_exc_info,
         structlog.processors.UnicodeDecoder(),
-        structlog.dev.ConsoleRenderer()
+        _log_renderer,
     ],
-    wrapper_class=structlog.stdlib.BoundLogger,
+    # Calls below the configured level return immediately, before any processor runs
+    wrapper_class=structlog.make_filtering_bound_logger(
+        getattr(logging, get_config().log_level.upper(), logging.INFO)
+    ),
     context_class=dict,
     logger_factory=structlog.stdlib.LoggerFactory(),
     cache_logger_on_first_use=True,
@@ -51,24 +67,80 @@ structlog.configure(
 
 logger = structlog.get_logger()
 
+# Format tracebacks for sign failures only when debugging
+_LOG_TRACEBACKS = get_config().log_level.upper() == "DEBUG"
+
+# Probe endpoints (health/stats) are answered from a short-lived cache
+HEALTH_CACHE_TTL = 0.5  # seconds
+STATS_CACHE_TTL = 1.0  # seconds
+
+_health_cache: Dict[str, Any] = {"ts": 0.0, "body": None}
+_health_lock = asyncio.Lock()
+_stats_cache: Dict[str, Any] = {"ts": 0.0, "body": None}
+_stats_lock = asyncio.Lock()
+
+
+async def _cached_json(
+    cache: Dict[str, Any],
+    lock: asyncio.Lock,
+    ttl: float,
+    build: Callable[[], Awaitable[Dict[str, Any]]],
+) -> Response:
+    """Serve a JSON body from cache, rebuilding it at most once per ttl."""
+    if cache["body"] is None or time.monotonic() - cache["ts"] >= ttl:
+        async with lock:
+            # Another request may have refreshed it while we waited
+            if cache["body"] is None or time.monotonic() - cache["ts"] >= ttl:
+                cache["body"] = orjson.dumps(await build())
+                cache["ts"] = time.monotonic()
+
+    return Response(content=cache["body"], media_type="application/json")
+
 
 # Request/Response models
 class SignRequest(BaseModel):
     """XYS signature request"""
+    model_config = ConfigDict(extra="ignore")
+
     url: str = Field(..., description="API URL path to sign")
     data: str = Field(default="", description="Request body data")
 
 
 class SignResponse(BaseModel):
     """XYS signature response"""
+    model_config = ConfigDict(populate_by_name=True, extra="ignore")
+
     success: bool
     x_s: str = Field(default="", alias="X-s")
     x_t: str = Field(default="", alias="X-t")
     x_s_common: str = Field(default="", alias="X-s-common")
     error: Optional[str] = None
 
-    class Config:
-        populate_by_name = True
+
+class SignBatchRequest(BaseModel):
+    """Several XYS signature requests signed in one page call"""
+    model_config = ConfigDict(extra="ignore")
+
+    items: List[SignRequest] = Field(
+        ..., min_length=1, max_length=100, description="Requests to sign, in order"
+    )
+
+
+class SignBatchResponse(BaseModel):
+    """Batch signature response; results follow the request order"""
+    success: bool
+    results: List[SignResponse] = []
+    error: Optional[str] = None
+
+
+class PrepareRequest(SignRequest):
+    """Signature request that can also ask for browser cookies"""
+    want_cookies: bool = Field(default=True, description="Include all browser cookies")
+
+
+class PrepareResponse(SignResponse):
+    """Signature response with optional browser cookies"""
+    all_cookies: Dict[str, str] = {}
 
 
 class HealthResponse(BaseModel):
@@ -125,13 +197,20 @@ async def lifespan(app: FastAPI):
     )
 
     # Initialize manager
-    await init_xys_manager(
+    manager = await init_xys_manager(
         max_instances=config.max_instances,
         min_instances=config.min_instances,
         headless=config.headless,
         browser_executable=config.default_browser_executable,
+        sign_timeout=config.sign_timeout,
+        sign_pages=config.sign_pages,
+        lazy=config.lazy_instances,
     )
 
+    # Bind once so handlers skip the global lookup on every request
+    app.state.manager = manager
+    app.state.generate_xys_signature = manager.generate_xys_signature
+
     logger.info("xys_sign_service_ready")
 
     yield
@@ -148,6 +227,7 @@ app = FastAPI(
     description="High-performance XYS signature generation service for XHS Creator platform",
     version="2.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Add CORS middleware
@@ -160,68 +240,180 @@ app.add_middleware(
 )
 
 
+def _sign_error(error: str, status_code: int = status.HTTP_200_OK) -> ORJSONResponse:
+    """Build a failed sign response with the same shape as SignResponse."""
+    return ORJSONResponse(
+        {
+            "success": False,
+            "X-s": "",
+            "X-t": "",
+            "X-s-common": "",
+            "error": error,
+        },
+        status_code=status_code,
+    )
+
+
 @app.post("/api/sign/xys", response_model=SignResponse)
-async def generate_xys_signature(request: SignRequest):
+async def generate_xys_signature(request: Request, body: SignRequest):
     """
     Generate XYS format signature for XHS API.
 
     This endpoint generates X-s, X-t, and X-s-common headers
     required for XHS Creator platform APIs.
+
+    Returns a pre-built ORJSONResponse; SignResponse only documents the shape.
+    Answers 503 without raising when no instance is ready.
     """
+    if not request.app.state.manager.has_ready_instance():
+        return _sign_error(
+            "No available browser instances",
+            status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+
     try:
-        manager = get_xys_manager()
-        result = await manager.generate_xys_signature(request.url, request.data)
+        result = await request.app.state.generate_xys_signature(body.url, body.data)
 
-        return SignResponse(
-            success=True,
-            **{
-                "X-s": result.get("X-s", ""),
-                "X-t": result.get("X-t", ""),
-                "X-s-common": result.get("X-s-common", ""),
-            }
-        )
+        return ORJSONResponse({
+            "success": True,
+            "X-s": result.get("X-s", ""),
+            "X-t": result.get("X-t", ""),
+            "X-s-common": result.get("X-s-common", ""),
+            "error": None,
+        })
 
     except BrowserNotReadyError as e:
+        # Lost a race for the last ready instance
         logger.warning("sign_request_failed_no_instance", error=str(e))
-        return SignResponse(
-            success=False,
-            error="No available browser instances"
+        return _sign_error("No available browser instances")
+
+    except Exception as e:
+        if _LOG_TRACEBACKS:
+            logger.exception("sign_request_failed", error=str(e))
+        else:
+            logger.error("sign_request_failed", error=str(e))
+
+        if isinstance(e, SignatureGenerationError):
+            return _sign_error(str(e))
+        return _sign_error(f"Internal error: {str(e)}")
+
+
+@app.post("/api/sign/batch", response_model=SignBatchResponse)
+async def generate_xys_signatures(request: Request, body: SignBatchRequest):
+    """
+    Generate XYS signatures for several requests at once.
+
+    The whole batch is signed on one instance in a single page call.
+    Items that fail carry success=false and an error; the rest still sign.
+    """
+    manager = request.app.state.manager
+    if not manager.has_ready_instance():
+        return ORJSONResponse(
+            {"success": False, "results": [], "error": "No available browser instances"},
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
         )
 
-    except SignatureGenerationError as e:
-        logger.error("sign_request_failed", error=str(e))
-        return SignResponse(
-            success=False,
-            error=str(e)
+    try:
+        results = await manager.generate_xys_signatures(
+            [(item.url, item.data) for item in body.items]
+        )
+
+        return ORJSONResponse({
+            "success": True,
+            "results": [
+                {
+                    "success": result["success"],
+                    "X-s": result.get("X-s", ""),
+                    "X-t": result.get("X-t", ""),
+                    "X-s-common": result.get("X-s-common", ""),
+                    "error": result.get("error"),
+                }
+                for result in results
+            ],
+            "error": None,
+        })
+
+    except BrowserNotReadyError as e:
+        logger.warning("sign_batch_failed_no_instance", error=str(e))
+        return ORJSONResponse(
+            {"success": False, "results": [], "error": "No available browser instances"}
         )
 
     except Exception as e:
-        logger.error("sign_request_error", error=str(e))
-        return SignResponse(
-            success=False,
-            error=f"Internal error: {str(e)}"
+        if _LOG_TRACEBACKS:
+            logger.exception("sign_batch_failed", error=str(e))
+        else:
+            logger.error("sign_batch_failed", error=str(e))
+
+        error = str(e) if isinstance(e, SignatureGenerationError) else f"Internal error: {str(e)}"
+        return ORJSONResponse({"success": False, "results": [], "error": error})
+
+
+@app.post("/api/sign/prepare", response_model=PrepareResponse)
+async def prepare_request(request: Request, body: PrepareRequest):
+    """
+    Generate XYS signature and return browser cookies in one round trip.
+
+    Clients send want_cookies=true on their first request and false once
+    they hold cookies, so later calls cost the same as /api/sign/xys.
+    """
+    manager = request.app.state.manager
+    if not manager.has_ready_instance():
+        return _sign_error(
+            "No available browser instances",
+            status.HTTP_503_SERVICE_UNAVAILABLE,
         )
 
+    try:
+        result = await manager.prepare_request(body.url, body.data, body.want_cookies)
+
+        return ORJSONResponse({
+            "success": True,
+            "X-s": result.get("X-s", ""),
+            "X-t": result.get("X-t", ""),
+            "X-s-common": result.get("X-s-common", ""),
+            "all_cookies": result.get("all_cookies", {}),
+            "error": None,
+        })
+
+    except BrowserNotReadyError as e:
+        logger.warning("prepare_request_failed_no_instance", error=str(e))
+        return _sign_error("No available browser instances")
+
+    except Exception as e:
+        if _LOG_TRACEBACKS:
+            logger.exception("prepare_request_failed", error=str(e))
+        else:
+            logger.error("prepare_request_failed", error=str(e))
+
+        if isinstance(e, SignatureGenerationError):
+            return _sign_error(str(e))
+        return _sign_error(f"Internal error: {str(e)}")
+
 
 @app.get("/api/health", response_model=HealthResponse)
-async def health_check():
+async def health_check(request: Request):
     """
     Check service health status.
 
     Returns overall health status and instance information.
+    Results are cached for HEALTH_CACHE_TTL to absorb liveness probes.
     """
-    try:
-        manager = get_xys_manager()
+    manager = request.app.state.manager
+
+    async def build() -> Dict[str, Any]:
         health = await manager.health_check()
+        return {
+            "status": "healthy" if health["healthy_instances"] > 0 else "unhealthy",
+            "manager_status": health["manager_status"],
+            "total_instances": health["total_instances"],
+            "healthy_instances": health["healthy_instances"],
+            "max_instances": health["max_instances"],
+            "min_instances": health["min_instances"],
+        }
 
-        return HealthResponse(
-            status="healthy" if health["healthy_instances"] > 0 else "unhealthy",
-            manager_status=health["manager_status"],
-            total_instances=health["total_instances"],
-            healthy_instances=health["healthy_instances"],
-            max_instances=health["max_instances"],
-            min_instances=health["min_instances"],
-        )
+    try:
+        return await _cached_json(_health_cache, _health_lock, HEALTH_CACHE_TTL, build)
 
     except Exception as e:
         logger.error("health_check_failed", error=str(e))
@@ -232,17 +424,20 @@ async def health_check():
 
 
 @app.get("/api/stats", response_model=StatsResponse)
-async def get_stats():
+async def get_stats(request: Request):
     """
     Get service statistics.
 
     Returns request counts, error rates, and instance information.
+    Results are cached for STATS_CACHE_TTL.
     """
-    try:
-        manager = get_xys_manager()
-        stats = manager.get_stats()
+    manager = request.app.state.manager
+
+    async def build() -> Dict[str, Any]:
+        return manager.get_stats()
 
-        return StatsResponse(**stats)
+    try:
+        return await _cached_json(_stats_cache, _stats_lock, STATS_CACHE_TTL, build)
 
     except Exception as e:
         logger.error("get_stats_failed", error=str(e))
@@ -253,21 +448,21 @@ async def get_stats():
 
 
 @app.get("/api/instances")
-async def list_instances():
+async def list_instances(request: Request):
     """
     List all browser instances.
 
     Returns detailed information about each instance.
     """
     try:
-        manager = get_xys_manager()
+        manager = request.app.state.manager
         instances = manager.get_instances()
 
-        return {
+        return ORJSONResponse({
             "success": True,
             "count": len(instances),
             "instances": instances,
-        }
+        })
 
     except Exception as e:
         logger.error("list_instances_failed", error=str(e))
@@ -278,12 +473,12 @@ async def list_instances():
 
 
 @app.get("/api/instances/{instance_id}")
-async def get_instance(instance_id: str):
+async def get_instance(request: Request, instance_id: str):
     """
     Get information about a specific instance.
     """
     try:
-        manager = get_xys_manager()
+        manager = request.app.state.manager
         instance = manager.get_instance(instance_id)
 
         if not instance:
@@ -309,14 +504,14 @@ async def get_instance(instance_id: str):
 
 
 @app.post("/api/instances")
-async def create_instance():
+async def create_instance(request: Request):
     """
     Create a new browser instance.
 
     Adds a new instance to the pool if below maximum.
     """
     try:
-        manager = get_xys_manager()
+        manager = request.app.state.manager
         instance = await manager.create_instance()
 
         return {
@@ -334,12 +529,12 @@ async def create_instance():
 
 
 @app.delete("/api/instances/{instance_id}")
-async def delete_instance(instance_id: str):
+async def delete_instance(request: Request, instance_id: str):
     """
     Stop and remove a browser instance.
     """
     try:
-        manager = get_xys_manager()
+        manager = request.app.state.manager
         await manager.stop_instance(instance_id)
 
         return {
@@ -366,14 +561,14 @@ class CookieResponse(BaseModel):
 
 
 @app.get("/api/cookies", response_model=CookieResponse)
-async def get_cookies():
+async def get_cookies(request: Request):
     """
     Get browser cookies (a1, webId, web_session, etc.)
 
     These cookies are required for XHS API authentication.
     """
     try:
-        manager = get_xys_manager()
+        manager = request.app.state.manager
         cookies = await manager.get_cookies()
 
         if not cookies:
@@ -400,6 +595,8 @@ async def get_cookies():
 
 class XsecTokenRequest(BaseModel):
     """Request for getting xsec_token"""
+    model_config = ConfigDict(extra="ignore")
+
     user_id: str
 
 
@@ -411,110 +608,63 @@ class XsecTokenResponse(BaseModel):
 
 
 @app.post("/api/xsec-token", response_model=XsecTokenResponse)
-async def get_xsec_token(request: XsecTokenRequest):
+async def get_xsec_token(request: Request, body: XsecTokenRequest):
     """
     Get xsec_token for a user profile page.
 
-    This navigates to the user's profile page and extracts the xsec_token
-    from the rendered page content.
+    This navigates a dedicated page to the user's profile and extracts
+    the xsec_token from the rendered page content.
     """
     try:
-        manager = get_xys_manager()
-        instance = await manager._get_available_instance()
+        manager = request.app.state.manager
+        xsec_token = await manager.get_xsec_token(body.user_id)
 
-        if not instance or not instance.page:
+        if xsec_token:
+            return XsecTokenResponse(
+                success=True,
+                xsec_token=xsec_token
+            )
+        else:
             return XsecTokenResponse(
                 success=False,
-                error="No available browser instance"
+                error="Could not extract xsec_token from page"
             )
 
-        try:
-            instance.status = InstanceStatus.BUSY
-            page = instance.page
-
-            # Navigate to user profile
-            profile_url = f"https://www.xiaohongshu.com/user/profile/{request.user_id}"
-            await page.goto(profile_url, wait_until="domcontentloaded", timeout=20000)
-
-            # Wait for Vue to render (reduced from 2s)
-            await asyncio.sleep(1)
-
-            # Extract xsec_token - simplified and faster
-            xsec_token = await page.evaluate("""
-                () => {
-                    try {
-                        // Method 1: Extract from page HTML (URL params) - fastest
-                        const match = document.body.innerHTML.match(/xsec_token=([A-Za-z0-9_=%-]+)/);
-                        if (match) {
-                            return decodeURIComponent(match[1]);
-                        }
-
-                        // Method 2: Search for xsecToken in HTML
-                        const match2 = document.body.innerHTML.match(/"xsecToken":"([^"]+)"/);
-                        if (match2) {
-                            return match2[1];
-                        }
-
-                        // Method 3: From __INITIAL_STATE__
-                        if (window.__INITIAL_STATE__ && window.__INITIAL_STATE__.user) {
-                            let notes = window.__INITIAL_STATE__.user.notes;
-                            if (notes && notes._rawValue) notes = notes._rawValue;
-                            else if (notes && notes._value) notes = notes._value;
-
-                            if (notes && Array.isArray(notes) && notes.length > 0) {
-                                const first = Array.isArray(notes[0]) ? notes[0][0] : notes[0];
-                                if (first && first.xsecToken) return first.xsecToken;
-                                if (first && first.noteCard && first.noteCard.xsecToken) {
-                                    return first.noteCard.xsecToken;
-                                }
-                            }
-                        }
-                        return null;
-                    } catch (e) {
-                        return null;
-                    }
-                }
-            """)
-
-            if xsec_token:
-                return XsecTokenResponse(
-                    success=True,
-                    xsec_token=xsec_token
-                )
-            else:
-                return XsecTokenResponse(
-                    success=False,
-                    error="Could not extract xsec_token from page"
-                )
-
-        finally:
-            instance.status = InstanceStatus.READY
-            # Navigate back to creator page to maintain session
-            await page.goto("https://creator.xiaohongshu.com", wait_until="domcontentloaded", timeout=30000)
+    except BrowserNotReadyError:
+        return XsecTokenResponse(
+            success=False,
+            error="No available browser instance"
+        )
 
     except Exception as e:
-        logger.error("get_xsec_token_failed", error=str(e), user_id=request.user_id)
+        logger.error("get_xsec_token_failed", error=str(e), user_id=body.user_id)
         return XsecTokenResponse(
             success=False,
             error=str(e)
         )
 
 
+# Static service info, serialized once at import
+_ROOT_BODY = orjson.dumps({
+    "service": "XYS Sign Service V2",
+    "version": "2.0.0",
+    "endpoints": {
+        "sign": "POST /api/sign/xys",
+        "sign_batch": "POST /api/sign/batch",
+        "prepare": "POST /api/sign/prepare",
+        "cookies": "GET /api/cookies",
+        "xsec_token": "POST /api/xsec-token",
+        "health": "GET /api/health",
+        "stats": "GET /api/stats",
+        "instances": "GET /api/instances",
+    }
+})
+
+
 @app.get("/")
 async def root():
     """Root endpoint with service info."""
-    return {
-        "service": "XYS Sign Service V2",
-        "version": "2.0.0",
-        "endpoints": {
-            "sign": "POST /api/sign/xys",
-            "cookies": "GET /api/cookies",
-            "xsec_token": "POST /api/xsec-token",
-            "health": "GET /api/health",
-            "stats": "GET /api/stats",
-            "instances": "GET /api/instances",
-        }
-    }
+    return Response(content=_ROOT_BODY, media_type="application/json")
 
 
 def main():
@@ -526,6 +676,8 @@ def main():
     parser.add_argument("--port", type=int, default=8080, help="Server port")
     parser.add_argument("--max-instances", type=int, default=5, help="Maximum browser instances")
     parser.add_argument("--min-instances", type=int, default=2, help="Minimum browser instances")
+    parser.add_argument("--sign-pages", type=int, default=2, help="Signing pages per browser instance")
+    parser.add_argument("--lazy-instances", action="store_true", help="Launch each browser on its first signing request")
     parser.add_argument("--headless", action="store_true", default=True, help="Run in headless mode")
     parser.add_argument("--no-headless", action="store_false", dest="headless", help="Run with browser UI")
     parser.add_argument("--log-level", default="INFO", help="Log level")
@@ -538,6 +690,8 @@ def main():
         port=args.port,
         max_instances=args.max_instances,
         min_instances=args.min_instances,
+        sign_pages=args.sign_pages,
+        lazy_instances=args.lazy_instances,
         headless=args.headless,
         log_level=args.log_level,
     )
@@ -552,13 +706,18 @@ def main():
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
 
-    # Run server
+    # Run server - uvloop has no Windows build, so fall back to asyncio there
     uvicorn.run(
         "server:app",
         host=config.host,
         port=config.port,
         log_level=config.log_level.lower(),
         reload=False,
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        access_log=False,
+        server_header=False,
+        date_header=False,
     )
 
 
@@ -16,7 +16,7 @@
     python test_login.py --cookies    # 仅获取当前 cookies
 
 依赖：
-    pip install aiohttp
+    pip install aiohttp orjson
 
 注意：
     运行前需要先启动 Sign Service: python server.py
@@ -25,155 +25,99 @@
 import asyncio
 import aiohttp
 import json
-import sys
+import orjson
 import os
-from datetime import datetime
+import sys
+import time
+from aiohttp import hdrs
+from multidict import CIMultiDict
 from typing import Dict, Optional, List
 
+from xhs_client import XHSSignClient, get_session, run
 
-class XHSCreatorLogin:
+
+class XHSCreatorLogin(XHSSignClient):
     """小红书 Creator 平台登录客户端"""
 
-    def __init__(self, sign_service_url: str = "http://localhost:8080"):
-        self.sign_service_url = sign_service_url
+    # Creator 平台使用 ugc 作为 xsecappid
+    XSECAPPID = "ugc"
+    XS_COMMON_HEADER = "X-S-Common"
+
+    def __init__(
+        self,
+        sign_service_url: str = "http://localhost:8080",
+        session: Optional[aiohttp.ClientSession] = None,
+    ):
+        super().__init__(sign_service_url, session)
         self.base_url = "https://customer.xiaohongshu.com"
         self.service_url = "https://creator.xiaohongshu.com"
-        
-        # Cookies from sign service
-        self.cookies: Dict[str, str] = {}
-        
-        # 请求头
-        self.headers = {
-            "Content-Type": "application/json",
-            "Origin": self.service_url,
-            "Referer": f"{self.service_url}/",
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/144.0.0.0 Safari/537.36",
+
+        # 请求头 (固定部分，构建一次；每次请求只复制后追加签名相关字段)
+        self.headers = CIMultiDict({
+            hdrs.CONTENT_TYPE: "application/json",
+            hdrs.ORIGIN: self.service_url,
+            hdrs.REFERER: f"{self.service_url}/",
+            hdrs.USER_AGENT: "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/144.0.0.0 Safari/537.36",
             "authorization": "",
             "x-ratelimit-meta": "host=creator.xiaohongshu.com",
-        }
+        })
 
-    def _build_cookie_string(self) -> str:
-        """构建 Cookie 请求头字符串"""
-        return "; ".join([f"{k}={v}" for k, v in self.cookies.items()])
+    def _apply_cookies(self, all_cookies: Dict[str, str]) -> None:
+        """保存从 sign service 获取的 cookies"""
+        super()._apply_cookies(all_cookies)
 
-    async def check_sign_service(self, session: aiohttp.ClientSession) -> bool:
-        """检查签名服务是否可用"""
-        try:
-            async with session.get(
-                f"{self.sign_service_url}/api/health", 
-                timeout=aiohttp.ClientTimeout(total=5)
-            ) as resp:
-                result = await resp.json()
-                return result.get("status") == "healthy"
-        except Exception as e:
-            print(f"  Error: {e}")
-            return False
-
-    async def fetch_cookies(self, session: aiohttp.ClientSession) -> bool:
-        """从签名服务获取所有 cookies"""
-        try:
-            async with session.get(
-                f"{self.sign_service_url}/api/cookies", 
-                timeout=aiohttp.ClientTimeout(total=10)
-            ) as resp:
-                result = await resp.json()
-                
-                if not result.get("success"):
-                    print(f"  Error: {result.get('error', 'Unknown error')}")
-                    return False
-                
-                # 使用所有从 sign service 获取的 cookies
-                all_cookies = result.get("all_cookies", {})
-                
-                # 添加必要的固定 cookie
-                all_cookies["xsecappid"] = "ugc"
-                
-                self.cookies = all_cookies
-                
-                # 检查关键 cookies
-                key_cookies = ["a1", "webId", "gid", "websectiga", "sec_poison_id"]
-                missing = [k for k in key_cookies if not self.cookies.get(k)]
-                if missing:
-                    print(f"  Warning: Missing cookies: {', '.join(missing)}")
-                    
-                return True
-                
-        except Exception as e:
-            print(f"  Error fetching cookies: {e}")
-            return False
+        # 检查关键 cookies
+        key_cookies = ["a1", "webId", "gid", "websectiga", "sec_poison_id"]
+        missing = [k for k in key_cookies if not self.cookies.get(k)]
+        if missing:
+            print(f"  Warning: Missing cookies: {', '.join(missing)}")
 
-    async def get_signature(self, session: aiohttp.ClientSession, url: str, data: str) -> dict:
-        """获取 XYS 签名"""
-        async with session.post(
-            f"{self.sign_service_url}/api/sign/xys",
-            json={"url": url, "data": data},
-            timeout=aiohttp.ClientTimeout(total=30)
-        ) as resp:
-            result = await resp.json()
-            if not result.get("success"):
-                raise Exception(f"Sign failed: {result.get('error', 'Unknown')}")
-            return {
-                "X-s": result["X-s"],
-                "X-t": result["X-t"],
-                "X-s-common": result.get("X-s-common", "")
-            }
-
-    async def send_verify_code(self, session: aiohttp.ClientSession, phone: str, zone: str = "86") -> dict:
+    async def send_verify_code(self, phone: str, zone: str = "86") -> dict:
         """发送手机验证码"""
         api_url = "/api/cas/customer/web/verify-code"
-        request_body = json.dumps({
+        request_body = orjson.dumps({
             "service": self.service_url,
             "phone": phone,
             "zone": zone
-        }, separators=(",", ":"))
-
-        sign_data = await self.get_signature(session, api_url, request_body)
-        headers = {
-            **self.headers,
-            "Cookie": self._build_cookie_string(),
-            "X-s": sign_data["X-s"],
-            "X-t": sign_data["X-t"],
-            "X-S-Common": sign_data["X-s-common"],
-        }
+        })
 
+        sign_data = await self.fetch_cookies_and_sign(api_url, request_body.decode())
+        headers = self._signed_headers(sign_data)
+
+        session = await self._get_session()
         async with session.post(
             f"{self.base_url}{api_url}",
             headers=headers,
             data=request_body,
-            timeout=aiohttp.ClientTimeout(total=30)
+            timeout=self._TIMEOUT_API
         ) as resp:
-            return await resp.json()
+            return orjson.loads(await resp.read())
 
-    async def login_with_code(self, session: aiohttp.ClientSession, phone: str, code: str, zone: str = "86") -> dict:
+    async def login_with_code(self, phone: str, code: str, zone: str = "86") -> dict:
         """使用验证码登录"""
         api_url = "/api/cas/customer/web/service-ticket"
         
-        request_body = json.dumps({
+        request_body = orjson.dumps({
             "service": self.service_url,
             "zone": zone,
             "phone": phone,
             "verify_code": code,
             "source": "",
             "type": "phoneVerifyCode"
-        }, separators=(",", ":"))
+        })
 
         try:
-            sign_data = await self.get_signature(session, api_url, request_body)
-            headers = {
-                **self.headers,
-                "Cookie": self._build_cookie_string(),
-                "X-s": sign_data["X-s"],
-                "X-t": sign_data["X-t"],
-                "X-S-Common": sign_data["X-s-common"],
-            }
+            sign_data = await self.fetch_cookies_and_sign(api_url, request_body.decode())
+            headers = self._signed_headers(sign_data)
 
+            session = await self._get_session()
             async with session.post(
                 f"{self.base_url}{api_url}",
                 headers=headers,
                 data=request_body,
-                timeout=aiohttp.ClientTimeout(total=30)
+                timeout=self._TIMEOUT_API
             ) as resp:
-                result = await resp.json()
+                result = orjson.loads(await resp.read())
                 set_cookies = resp.headers.getall("Set-Cookie", [])
                 return {
                     "success": result.get("success", False),
@@ -187,10 +131,10 @@ class XHSCreatorLogin:
         """解析 Set-Cookie 响应头"""
         cookies = {}
         for header in set_cookie_headers:
-            # 取第一个分号前的部分
-            cookie_part = header.split(";")[0]
-            if "=" in cookie_part:
-                name, value = cookie_part.split("=", 1)
+            # 取第一个分号前的部分，partition 只扫描到首个分隔符
+            cookie_part, _, _ = header.partition(";")
+            name, sep, value = cookie_part.partition("=")
+            if sep:
                 cookies[name.strip()] = value.strip()
         return cookies
 
@@ -200,12 +144,12 @@ class XHSCreatorLogin:
         all_cookies = {**self.cookies, **login_cookies}
         
         data = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
             "cookies": all_cookies
         }
         
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        with open(filename, "wb") as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
         
         return filename
 
@@ -218,6 +162,54 @@ def sync_input(prompt: str) -> str:
         return ""
 
 
+# 已从 stdin 读取、尚未返回的输入 (粘贴或提前输入的多行留给后续 ainput)
+_stdin_pending = bytearray()
+
+
+async def ainput(prompt: str) -> str:
+    """异步读取用户输入 (由事件循环监听 stdin，不占用线程池)
+
+    直接对 fd 调用 os.read 并自行按行切分，不经过 sys.stdin 的缓冲区，
+    多余的行保存在 _stdin_pending 中，不会被遗留在监听不到的缓冲区里。
+    事件循环不支持 add_reader 时 (Windows Proactor、stdin 为普通文件)
+    回退到线程池中的 sync_input。
+    """
+    loop = asyncio.get_running_loop()
+    sys.stdout.write(prompt)
+    sys.stdout.flush()
+
+    while b"\n" not in _stdin_pending:
+        fut = loop.create_future()
+
+        def on_readable() -> None:
+            loop.remove_reader(fd)
+            if not fut.done():
+                try:
+                    fut.set_result(os.read(fd, 4096))
+                except OSError as e:
+                    fut.set_exception(e)
+
+        try:
+            fd = sys.stdin.fileno()
+            loop.add_reader(fd, on_readable)
+        except (NotImplementedError, OSError, ValueError):
+            return await loop.run_in_executor(None, sync_input, "")
+
+        try:
+            chunk = await fut
+        finally:
+            loop.remove_reader(fd)
+
+        if not chunk:
+            # EOF: 返回最后一段未换行的输入 (没有则为空)
+            break
+        _stdin_pending.extend(chunk)
+
+    line, _, rest = bytes(_stdin_pending).partition(b"\n")
+    _stdin_pending[:] = rest
+    return line.decode(sys.stdin.encoding or "utf-8", errors="replace").strip()
+
+
 async def main():
     """完整登录流程"""
     print("=" * 60)
@@ -225,13 +217,14 @@ async def main():
     print("=" * 60)
     print()
 
-    client = XHSCreatorLogin()
-    connector = aiohttp.TCPConnector(limit=10)
-    
-    async with aiohttp.ClientSession(connector=connector) as session:
+    client = XHSCreatorLogin(session=await get_session())
+
+    # Step 1 与 Step 2 互不依赖，并发请求；Step 2 的错误信息留到其标题之后输出
+    print("[1/5] 检查签名服务...")
+    cookies_task = asyncio.create_task(client.fetch_cookies_quietly())
+    try:
         # Step 1: 检查签名服务
-        print("[1/5] 检查签名服务...")
-        if not await client.check_sign_service(session):
+        if not await client.check_sign_service():
             print("  ❌ 签名服务未运行")
             print("  请先启动: python server.py")
             return
@@ -239,59 +232,69 @@ async def main():
 
         # Step 2: 获取 cookies
         print("\n[2/5] 获取浏览器 cookies...")
-        if not await client.fetch_cookies(session):
-            print("  ❌ 获取 cookies 失败")
-            return
-        print(f"  ✓ 获取 {len(client.cookies)} 个 cookies")
-        print(f"    a1: {client.cookies.get('a1', '')[:20]}..." if client.cookies.get('a1') else "    a1: (empty)")
-        print(f"    webId: {client.cookies.get('webId', '')[:20]}..." if client.cookies.get('webId') else "    webId: (empty)")
-
-        # Step 3: 输入手机号
-        print("\n[3/5] 输入手机号")
-        loop = asyncio.get_event_loop()
-        phone = await loop.run_in_executor(None, sync_input, "  手机号: ")
-        if not phone:
-            print("  已取消")
-            return
+        cookies_error = await cookies_task
+    finally:
+        cookies_task.cancel()
+    if cookies_error:
+        print(f"  {cookies_error}")
+        print("  ❌ 获取 cookies 失败")
+        return
+    print(f"  ✓ 获取 {len(client.cookies)} 个 cookies")
+    print(f"    a1: {client.cookies.get('a1', '')[:20]}..." if client.cookies.get('a1') else "    a1: (empty)")
+    print(f"    webId: {client.cookies.get('webId', '')[:20]}..." if client.cookies.get('webId') else "    webId: (empty)")
+
+    # Step 3: 输入手机号
+    print("\n[3/5] 输入手机号")
+    phone = await ainput("  手机号: ")
+    if not phone:
+        print("  已取消")
+        return
+
+    # Step 4: 发送验证码
+    print("\n[4/5] 发送验证码...")
+    result = await client.send_verify_code(phone)
+    if not result.get("success"):
+        print(f"  ❌ 发送失败: {result}")
+        return
+    print("  ✓ 验证码已发送，请查收短信")
+
+    # Step 5: 输入验证码并登录
+    print("\n[5/5] 登录")
+    # 用户输入验证码期间保持签名服务连接可用，登录签名无需重新握手
+    warm_up = asyncio.create_task(client.warm_up())
+    try:
+        code = await ainput("  验证码: ")
+        await warm_up
+    finally:
+        # 输入被中断 (Ctrl-C、取消) 时不留下未完成的预热任务
+        warm_up.cancel()
+    if not code:
+        print("  已取消")
+        return
+
+    print("  正在登录...")
+    result = await client.login_with_code(phone, code)
 
-        # Step 4: 发送验证码
-        print("\n[4/5] 发送验证码...")
-        result = await client.send_verify_code(session, phone)
-        if not result.get("success"):
-            print(f"  ❌ 发送失败: {result}")
-            return
-        print("  ✓ 验证码已发送，请查收短信")
+    print()
+    print("=" * 60)
+    if result.get("success"):
+        print("  ✅ 登录成功!")
+        print("=" * 60)
 
-        # Step 5: 输入验证码并登录
-        print("\n[5/5] 登录")
-        code = await loop.run_in_executor(None, sync_input, "  验证码: ")
-        if not code:
-            print("  已取消")
-            return
+        # 显示获取的 cookies
+        login_cookies = result.get("cookies", {})
+        print("\n获取的登录 cookies:")
+        for name, value in login_cookies.items():
+            display_value = value[:40] + "..." if len(value) > 40 else value
+            print(f"  {name}: {display_value}")
 
-        print("  正在登录...")
-        result = await client.login_with_code(session, phone, code)
-        
-        print()
+        # 保存 cookies
+        filename = client.save_cookies(login_cookies)
+        print(f"\n✓ Cookies 已保存到: {filename}")
+    else:
+        print("  ❌ 登录失败")
         print("=" * 60)
-        if result.get("success"):
-            print("  ✅ 登录成功!")
-            print("=" * 60)
-            
-            # 显示获取的 cookies
-            login_cookies = result.get("cookies", {})
-            print("\n获取的登录 cookies:")
-            for name, value in login_cookies.items():
-                display_value = value[:40] + "..." if len(value) > 40 else value
-                print(f"  {name}: {display_value}")
-            
-            # 保存 cookies
-            filename = client.save_cookies(login_cookies)
-            print(f"\n✓ Cookies 已保存到: {filename}")
-        else:
-            print("  ❌ 登录失败")
-            print("=" * 60)
-            print(f"\n响应: {json.dumps(result.get('response', result), indent=2, ensure_ascii=False)}")
+        print(f"\n响应: {json.dumps(result.get('response', result), indent=2, ensure_ascii=False)}")
 
 
 async def test_sign():
@@ -300,33 +303,32 @@ async def test_sign():
     print("  XYS 签名测试")
     print("=" * 60)
     
-    client = XHSCreatorLogin()
+    client = XHSCreatorLogin(session=await get_session())
     
-    async with aiohttp.ClientSession() as session:
-        print("\n[1/3] 检查签名服务...")
-        if not await client.check_sign_service(session):
-            print("  ❌ 签名服务未运行")
-            return
-        print("  ✓ 服务正常")
-        
-        print("\n[2/3] 获取 cookies...")
-        if not await client.fetch_cookies(session):
-            print("  ❌ 失败")
-            return
-        print(f"  ✓ 获取 {len(client.cookies)} 个 cookies")
-        
-        print("\n[3/3] 测试签名生成...")
-        test_url = "/api/cas/customer/web/verify-code"
-        test_data = '{"service":"https://creator.xiaohongshu.com","phone":"13800138000","zone":"86"}'
-        
-        try:
-            sign = await client.get_signature(session, test_url, test_data)
-            print(f"  ✓ 签名生成成功")
-            print(f"    X-s: {sign['X-s'][:50]}...")
-            print(f"    X-t: {sign['X-t']}")
-            print(f"    X-s-common: {sign['X-s-common'][:50]}..." if sign['X-s-common'] else "    X-s-common: (empty)")
-        except Exception as e:
-            print(f"  ❌ 失败: {e}")
+    print("\n[1/3] 检查签名服务...")
+    if not await client.check_sign_service():
+        print("  ❌ 签名服务未运行")
+        return
+    print("  ✓ 服务正常")
+
+    print("\n[2/3] 获取 cookies...")
+    if not await client.fetch_cookies():
+        print("  ❌ 失败")
+        return
+    print(f"  ✓ 获取 {len(client.cookies)} 个 cookies")
+
+    print("\n[3/3] 测试签名生成...")
+    test_url = "/api/cas/customer/web/verify-code"
+    test_data = '{"service":"https://creator.xiaohongshu.com","phone":"13800138000","zone":"86"}'
+
+    try:
+        sign = await client.get_signature(test_url, test_data)
+        print(f"  ✓ 签名生成成功")
+        print(f"    X-s: {sign['X-s'][:50]}...")
+        print(f"    X-t: {sign['X-t']}")
+        print(f"    X-s-common: {sign['X-s-common'][:50]}..." if sign['X-s-common'] else "    X-s-common: (empty)")
+    except Exception as e:
+        print(f"  ❌ 失败: {e}")
 
 
 async def test_cookies():
@@ -335,28 +337,27 @@ async def test_cookies():
     print("  Cookies 获取测试")
     print("=" * 60)
     
-    client = XHSCreatorLogin()
+    client = XHSCreatorLogin(session=await get_session())
     
-    async with aiohttp.ClientSession() as session:
-        print("\n[1/2] 检查签名服务...")
-        if not await client.check_sign_service(session):
-            print("  ❌ 签名服务未运行")
-            return
-        print("  ✓ 服务正常")
-        
-        print("\n[2/2] 获取 cookies...")
-        if not await client.fetch_cookies(session):
-            print("  ❌ 失败")
-            return
-            
-        print(f"\n共获取 {len(client.cookies)} 个 cookies:")
-        print("-" * 40)
-        for name, value in sorted(client.cookies.items()):
-            if value:
-                display_value = value[:50] + "..." if len(value) > 50 else value
-                print(f"  {name}: {display_value}")
-            else:
-                print(f"  {name}: (empty)")
+    print("\n[1/2] 检查签名服务...")
+    if not await client.check_sign_service():
+        print("  ❌ 签名服务未运行")
+        return
+    print("  ✓ 服务正常")
+
+    print("\n[2/2] 获取 cookies...")
+    if not await client.fetch_cookies():
+        print("  ❌ 失败")
+        return
+
+    print(f"\n共获取 {len(client.cookies)} 个 cookies:")
+    print("-" * 40)
+    for name, value in sorted(client.cookies.items()):
+        if value:
+            display_value = value[:50] + "..." if len(value) > 50 else value
+            print(f"  {name}: {display_value}")
+        else:
+            print(f"  {name}: (empty)")
 
 
 def print_usage():
@@ -380,13 +381,13 @@ if __name__ == "__main__":
     if len(sys.argv) > 1:
         arg = sys.argv[1]
         if arg == "--sign-only":
-            asyncio.run(test_sign())
+            run(test_sign())
         elif arg == "--cookies":
-            asyncio.run(test_cookies())
+            run(test_cookies())
         elif arg in ["--help", "-h"]:
             print_usage()
         else:
             print(f"未知选项: {arg}")
             print_usage()
     else:
-        asyncio.run(main())
+        run(main())
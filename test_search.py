@@ -13,99 +13,59 @@
 
 import asyncio
 import aiohttp
+import base64
 import json
+import orjson
+import secrets
 import sys
-from typing import Dict, Optional, List
+from aiohttp import hdrs
+from multidict import CIMultiDict
+from typing import Dict, Optional
 
+from xhs_client import SECURITY_COOKIE_KEYS, XHSSignClient, get_session, run
 
-class XHSSearchClient:
+
+SEARCH_API_URL = "/api/sns/web/v1/search/notes"
+
+# 搜索请求体中的固定字段，序列化一次 (去掉开头的 "{"，以 "," 接在动态字段后)
+_SEARCH_BODY_TAIL = b"," + orjson.dumps({
+    "ext_flags": [],
+    "geo": "",
+    "image_formats": ["jpg", "webp", "avif"],
+})[1:]
+
+
+class XHSSearchClient(XHSSignClient):
     """小红书笔记搜索客户端"""
 
-    def __init__(self, sign_service_url: str = "http://localhost:8080"):
-        self.sign_service_url = sign_service_url
+    def __init__(
+        self,
+        sign_service_url: str = "http://localhost:8080",
+        session: Optional[aiohttp.ClientSession] = None,
+    ):
+        super().__init__(sign_service_url, session)
         self.base_url = "https://edith.xiaohongshu.com"
-        
-        # 安全 cookies (从签名服务获取)
-        self.security_cookies: Dict[str, str] = {}
 
-        # 用户登录 cookies (从 login_cookies.json 加载)
-        self.user_cookies: Dict[str, str] = {}
-        
-        # 请求头
-        self.headers = {
-            "Content-Type": "application/json;charset=UTF-8",
-            "Origin": "https://www.xiaohongshu.com",
-            "Referer": "https://www.xiaohongshu.com/",
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/144.0.0.0 Safari/537.36 Edg/144.0.0.0",
-            "Accept": "application/json, text/plain, */*",
-            "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
-        }
-
-    def _build_cookie_string(self) -> str:
-        """合并安全 cookies 和用户 cookies"""
-        all_cookies = {**self.security_cookies, **self.user_cookies}
-        return "; ".join([f"{k}={v}" for k, v in all_cookies.items()])
-
-    async def check_sign_service(self, session: aiohttp.ClientSession) -> bool:
-        """检查签名服务是否可用"""
-        try:
-            async with session.get(
-                f"{self.sign_service_url}/api/health",
-                timeout=aiohttp.ClientTimeout(total=5)
-            ) as resp:
-                result = await resp.json()
-                return result.get("status") == "healthy"
-        except Exception as e:
-            print(f"  Error: {e}")
-            return False
-
-    async def fetch_security_cookies(self, session: aiohttp.ClientSession) -> bool:
-        """从签名服务获取安全 cookies (a1, webId, gid 等)"""
-        try:
-            async with session.get(
-                f"{self.sign_service_url}/api/cookies",
-                timeout=aiohttp.ClientTimeout(total=10)
-            ) as resp:
-                result = await resp.json()
-                
-                if not result.get("success"):
-                    print(f"  Error: {result.get('error', 'Unknown')}")
-                    return False
-                
-                all_cookies = result.get("all_cookies", {})
-                
-                # 只取安全相关的 cookies
-                security_keys = ["a1", "webId", "gid", "websectiga", "sec_poison_id", "acw_tc", "loadts", "xsecappid"]
-                self.security_cookies = {k: v for k, v in all_cookies.items() if k in security_keys or k not in self.user_cookies}
-                
-                # 确保 xsecappid 设置为 xhs-pc-web (Web 端)
-                self.security_cookies["xsecappid"] = "xhs-pc-web"
-                
-                return True
-                
-        except Exception as e:
-            print(f"  Error: {e}")
-            return False
-
-    async def get_signature(self, session: aiohttp.ClientSession, url: str, data: str) -> dict:
-        """获取 XYS 签名"""
-        async with session.post(
-            f"{self.sign_service_url}/api/sign/xys",
-            json={"url": url, "data": data},
-            timeout=aiohttp.ClientTimeout(total=30)
-        ) as resp:
-            result = await resp.json()
-            if not result.get("success"):
-                raise Exception(f"Sign failed: {result.get('error', 'Unknown')}")
-            return {
-                "X-s": result["X-s"],
-                "X-t": result["X-t"],
-                "X-s-common": result.get("X-s-common", "")
-            }
+        # 请求头 (固定部分，构建一次；每次请求只复制后追加签名相关字段)
+        self.headers = CIMultiDict({
+            hdrs.CONTENT_TYPE: "application/json;charset=UTF-8",
+            hdrs.ORIGIN: "https://www.xiaohongshu.com",
+            hdrs.REFERER: "https://www.xiaohongshu.com/",
+            hdrs.USER_AGENT: "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/144.0.0.0 Safari/537.36 Edg/144.0.0.0",
+            hdrs.ACCEPT: "application/json, text/plain, */*",
+            hdrs.ACCEPT_LANGUAGE: "zh-CN,zh;q=0.9,en;q=0.8",
+        })
+
+    def _apply_cookies(self, all_cookies: Dict[str, str]) -> None:
+        """保存从签名服务获取的安全 cookies"""
+        # 只取安全相关的 cookies，其余以用户登录 cookies 为准
+        super()._apply_cookies({
+            k: v for k, v in all_cookies.items()
+            if k in SECURITY_COOKIE_KEYS or k not in self.user_cookies
+        })
 
     async def search_notes(
         self,
-        session: aiohttp.ClientSession,
         keyword: str,
         page: int = 1,
         page_size: int = 20,
@@ -122,61 +82,70 @@ class XHSSearchClient:
             sort: 排序方式 (general/hot/time)
             note_type: 笔记类型 (0=全部, 1=视频, 2=图文)
         """
-        api_url = "/api/sns/web/v1/search/notes"
+        api_url = SEARCH_API_URL
         
-        # 生成随机 search_id
-        import random
-        import string
-        search_id = ''.join(random.choices(string.ascii_lowercase + string.digits, k=21))
+        # 生成随机 search_id (21 位小写字母与数字)
+        search_id = base64.b32encode(secrets.token_bytes(16))[:21].decode("ascii").lower()
         
-        request_body = json.dumps({
+        # 固定字段已预先序列化，拼在动态字段之后 (字段顺序不变)
+        request_body = orjson.dumps({
             "keyword": keyword,
             "page": page,
             "page_size": page_size,
             "search_id": search_id,
             "sort": sort,
             "note_type": note_type,
-            "ext_flags": [],
-            "geo": "",
-            "image_formats": ["jpg", "webp", "avif"]
-        }, separators=(",", ":"))
+        })[:-1] + _SEARCH_BODY_TAIL
 
-        # 获取签名
-        sign_data = await self.get_signature(session, api_url, request_body)
+        # 获取签名 (首次请求时一并获取安全 cookies)
+        sign_data = await self.fetch_cookies_and_sign(api_url, request_body.decode())
         
-        headers = {
-            **self.headers,
-            "Cookie": self._build_cookie_string(),
-            "X-s": sign_data["X-s"],
-            "X-t": sign_data["X-t"],
-            "X-s-common": sign_data["X-s-common"],
-        }
+        headers = self._signed_headers(sign_data)
 
+        session = await self._get_session()
         async with session.post(
             f"{self.base_url}{api_url}",
             headers=headers,
             data=request_body,
-            timeout=aiohttp.ClientTimeout(total=30)
+            timeout=self._TIMEOUT_API
         ) as resp:
-            return await resp.json()
+            return project_search_result(orjson.loads(await resp.read()))
 
-    def load_cookies_from_file(self, filename: str = "login_cookies.json") -> bool:
-        """从文件加载登录 cookies"""
-        try:
-            with open(filename, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                cookies = data.get("cookies", {})
-                # 更新用户 cookies (排除安全类 cookies)
-                security_keys = ["a1", "webId", "gid", "websectiga", "sec_poison_id", "acw_tc", "loadts", "xsecappid"]
-                for k, v in cookies.items():
-                    if k not in security_keys:
-                        self.user_cookies[k] = v
-                return True
-        except FileNotFoundError:
-            return False
-        except Exception as e:
-            print(f"  Load cookies error: {e}")
-            return False
+
+# 搜索结果中展示的条数
+DISPLAY_LIMIT = 10
+
+
+def project_search_result(result: dict, limit: int = DISPLAY_LIMIT) -> dict:
+    """只保留展示用字段 (前 limit 条笔记的 id / 标题 / 作者 / 点赞数)
+
+    失败响应原样返回，便于打印完整错误信息。
+    """
+    if not result.get("success"):
+        return result
+
+    data = result.get("data") or {}
+    items = data.get("items") or []
+    projected = []
+    for item in items[:limit]:
+        note_card = item.get("note_card") or {}
+        projected.append({
+            "id": item.get("id", ""),
+            "note_card": {
+                "display_title": note_card.get("display_title", "无标题"),
+                "user": {"nickname": (note_card.get("user") or {}).get("nickname", "未知用户")},
+                "interact_info": {"liked_count": (note_card.get("interact_info") or {}).get("liked_count", "0")},
+            },
+        })
+
+    return {
+        "success": True,
+        "data": {
+            "items": projected,
+            "total": len(items),
+            "has_more": data.get("has_more", False),
+        },
+    }
 
 
 async def main(keyword: str, page: int = 1):
@@ -186,73 +155,73 @@ async def main(keyword: str, page: int = 1):
     print("=" * 60)
     print()
 
-    client = XHSSearchClient()
-    
-    # 从文件加载登录 cookies
-    if client.load_cookies_from_file():
+    client = XHSSearchClient(session=await get_session())
+
+    # 读取登录 cookies (线程池) 与检查签名服务并发进行
+    loop = asyncio.get_running_loop()
+    cookies_loaded, healthy = await asyncio.gather(
+        loop.run_in_executor(None, client.load_cookies_from_file),
+        client.check_sign_service(),
+    )
+
+    if cookies_loaded:
         print("✓ 已从 login_cookies.json 加载登录信息")
     else:
         print("✗ 未找到 login_cookies.json，请先运行 python test_login.py 登录")
         return
     print()
 
-    async with aiohttp.ClientSession() as session:
-        # Step 1: 检查签名服务
-        print("[1/3] 检查签名服务...")
-        if not await client.check_sign_service(session):
-            print("  ❌ 签名服务未运行")
-            print("  请先启动: python server.py")
-            return
-        print("  ✓ 服务正常")
-
-        # Step 2: 获取安全 cookies
-        print("\n[2/3] 获取安全 cookies...")
-        if not await client.fetch_security_cookies(session):
-            print("  ❌ 获取失败")
-            return
-        print(f"  ✓ a1: {client.security_cookies.get('a1', '')[:20]}...")
-        print(f"  ✓ webId: {client.security_cookies.get('webId', '')[:20]}...")
-
-        # Step 3: 搜索笔记
-        print(f"\n[3/3] 搜索: {keyword} (第 {page} 页)...")
-        try:
-            result = await client.search_notes(session, keyword, page=page)
-            
-            print()
+    # Step 1: 检查签名服务
+    print("[1/2] 检查签名服务...")
+    if not healthy:
+        print("  ❌ 签名服务未运行")
+        print("  请先启动: python server.py")
+        return
+    print("  ✓ 服务正常")
+
+    # Step 2: 搜索笔记 (签名请求同时返回安全 cookies)
+    print(f"\n[2/2] 搜索: {keyword} (第 {page} 页)...")
+    try:
+        result = await client.search_notes(keyword, page=page)
+        print(f"  ✓ a1: {client.cookies.get('a1', '')[:20]}...")
+        print(f"  ✓ webId: {client.cookies.get('webId', '')[:20]}...")
+
+        print()
+        print("=" * 60)
+
+        if result.get("success"):
+            items = result["data"]["items"]
+            total = result["data"]["total"]
+            has_more = result["data"]["has_more"]
+
+            print(f"  ✅ 搜索成功! 找到 {total} 条结果")
             print("=" * 60)
-            
-            if result.get("success"):
-                items = result.get("data", {}).get("items", [])
-                has_more = result.get("data", {}).get("has_more", False)
-                
-                print(f"  ✅ 搜索成功! 找到 {len(items)} 条结果")
-                print("=" * 60)
+            print()
+
+            for i, item in enumerate(items, 1):  # 只显示前 DISPLAY_LIMIT 条
+                note_card = item.get("note_card", {})
+                note_id = item.get("id", "")
+                title = note_card.get("display_title", "无标题")
+                user = note_card.get("user", {})
+                nickname = user.get("nickname", "未知用户")
+                liked_count = note_card.get("interact_info", {}).get("liked_count", "0")
+
+                print(f"{i}. [{note_id[:8]}...] {title[:40]}")
+                print(f"   👤 {nickname} | ❤️ {liked_count}")
                 print()
-                
-                for i, item in enumerate(items[:10], 1):  # 只显示前10条
-                    note_card = item.get("note_card", {})
-                    note_id = item.get("id", "")
-                    title = note_card.get("display_title", "无标题")
-                    user = note_card.get("user", {})
-                    nickname = user.get("nickname", "未知用户")
-                    liked_count = note_card.get("interact_info", {}).get("liked_count", "0")
-                    
-                    print(f"{i}. [{note_id[:8]}...] {title[:40]}")
-                    print(f"   👤 {nickname} | ❤️ {liked_count}")
-                    print()
-                
-                if len(items) > 10:
-                    print(f"... 还有 {len(items) - 10} 条结果")
-                
-                if has_more:
-                    print(f"\n💡 还有更多结果，使用 --page {page + 1} 查看下一页")
-            else:
-                print("  ❌ 搜索失败")
-                print("=" * 60)
-                print(f"\n响应: {json.dumps(result, indent=2, ensure_ascii=False)}")
-                
-        except Exception as e:
-            print(f"  ❌ 搜索出错: {e}")
+
+            if total > len(items):
+                print(f"... 还有 {total - len(items)} 条结果")
+
+            if has_more:
+                print(f"\n💡 还有更多结果，使用 --page {page + 1} 查看下一页")
+        else:
+            print("  ❌ 搜索失败")
+            print("=" * 60)
+            print(f"\n响应: {json.dumps(result, indent=2, ensure_ascii=False)}")
+
+    except Exception as e:
+        print(f"  ❌ 搜索出错: {e}")
 
 
 def print_usage():
@@ -294,4 +263,4 @@ if __name__ == "__main__":
             print("错误: --page 需要一个数字参数")
             sys.exit(1)
     
-    asyncio.run(main(keyword, page))
+    run(main(keyword, page))
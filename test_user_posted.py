@@ -9,94 +9,137 @@
     python test_user_posted.py --user-id 5c2686820000000007031438
     python test_user_posted.py --user-id 5c2686820000000007031438 --num 30
     python test_user_posted.py --user-id 5c2686820000000007031438 --cursor xxxxx
+    python test_user_posted.py --user-id 5c2686820000000007031438 --all
+    python test_user_posted.py --user-id 5c2686820000000007031438,5ff0e6410000000001008400
+    python test_user_posted.py --user-id 5c2686820000000007031438 --debug
     python test_user_posted.py --help
 """
 
+import argparse
 import asyncio
 import aiohttp
 import json
+import logging
+import orjson
+import os
 import sys
-from typing import Dict, Optional
+import time
+from types import MappingProxyType
+from typing import AsyncIterator, Dict, List, Optional
 from urllib.parse import urlencode
 import re
 
+from xhs_client import SlidingWindowLimiter, XHSSignClient, get_session, run
 
-class XHSUserPostedClient:
+logger = logging.getLogger(__name__)
+
+# 安全 cookies 磁盘缓存 (a1、webId 等不随翻页变化，有效期内跳过健康检查与获取)
+SECURITY_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".cache", "xhs_sign", "security.json")
+SECURITY_CACHE_TTL = 600
+
+# user_posted 请求的固定请求头 (只读，所有客户端共享)
+DEFAULT_HEADERS = MappingProxyType({
+    "Accept": "application/json, text/plain, */*",
+    "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8,en-GB;q=0.7,en-US;q=0.6",
+    "Origin": "https://www.xiaohongshu.com",
+    "Referer": "https://www.xiaohongshu.com/",
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/144.0.0.0 Safari/537.36 Edg/144.0.0.0",
+    "sec-ch-ua": '"Not(A:Brand";v="8", "Chromium";v="144", "Microsoft Edge";v="144"',
+    "sec-ch-ua-mobile": "?0",
+    "sec-ch-ua-platform": '"Windows"',
+    "sec-fetch-dest": "empty",
+    "sec-fetch-mode": "cors",
+    "sec-fetch-site": "same-site",
+})
+
+
+class XHSUserPostedClient(XHSSignClient):
     """小红书博主笔记获取客户端"""
 
-    def __init__(self, sign_service_url: str = "http://localhost:8080"):
-        self.sign_service_url = sign_service_url
-        self.base_url = "https://edith.xiaohongshu.com"
+    USER_POSTED_PATH = "/api/sns/web/v1/user_posted"
 
-        # 安全 cookies (从签名服务获取)
-        self.security_cookies: Dict[str, str] = {}
-
-        # 用户登录 cookies (从 login_cookies.json 加载)
-        self.user_cookies: Dict[str, str] = {}
-
-        # 请求头
-        self.headers = {
-            "Accept": "application/json, text/plain, */*",
-            "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8,en-GB;q=0.7,en-US;q=0.6",
-            "Origin": "https://www.xiaohongshu.com",
-            "Referer": "https://www.xiaohongshu.com/",
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/144.0.0.0 Safari/537.36 Edg/144.0.0.0",
-            "sec-ch-ua": '"Not(A:Brand";v="8", "Chromium";v="144", "Microsoft Edge";v="144"',
-            "sec-ch-ua-mobile": "?0",
-            "sec-ch-ua-platform": '"Windows"',
-            "sec-fetch-dest": "empty",
-            "sec-fetch-mode": "cors",
-            "sec-fetch-site": "same-site",
-        }
+    # 查询参数中的固定部分
+    _STATIC_QS = "image_formats=jpg,webp,avif"
 
-    def _build_cookie_string(self) -> str:
-        """合并安全 cookies 和用户 cookies
+    # 每分钟最多请求 user_posted 的次数 (连续翻页时避免触发风控)
+    DEFAULT_RPM = 20
 
-        关键：用户登录 cookies 必须覆盖签名服务的 cookies，
-        因为 web_session 需要与 a1 等一起使用才能正常认证。
-        """
-        # 安全 cookies 为基础，用户 cookies 覆盖
-        all_cookies = {**self.security_cookies, **self.user_cookies}
+    # 批量获取多个博主时的并发数 (与签名服务默认 max_instances 一致)
+    DEFAULT_CONCURRENCY = 5
 
-        # 强制设置 xsecappid 为 xhs-pc-web（Web 端 API 必需）
-        all_cookies["xsecappid"] = "xhs-pc-web"
+    def __init__(
+        self,
+        sign_service_url: str = "http://localhost:8080",
+        session: Optional[aiohttp.ClientSession] = None,
+        rpm: int = DEFAULT_RPM,
+    ):
+        super().__init__(sign_service_url, session)
+        self.base_url = "https://edith.xiaohongshu.com"
+
+        # 小红书接口限速
+        self.limiter = SlidingWindowLimiter(rpm)
+
+        # 固定请求头 (作为会话默认请求头，每次请求只传签名相关字段；
+        # 传入 session 时需已设置这些默认请求头)
+        self.headers = DEFAULT_HEADERS
 
-        return "; ".join([f"{k}={v}" for k, v in all_cookies.items()])
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """获取 HTTP 会话 (未传入时使用模块级共享会话，以 self.headers 为默认请求头)"""
+        if self.session is None:
+            self.session = await get_session(self.headers)
+        return self.session
 
-    async def check_sign_service(self, session: aiohttp.ClientSession) -> bool:
-        """检查签名服务是否可用"""
+    def load_cached_security_cookies(self) -> bool:
+        """从磁盘缓存加载安全 cookies (SECURITY_CACHE_TTL 内有效)"""
         try:
-            async with session.get(
-                f"{self.sign_service_url}/api/health",
-                timeout=aiohttp.ClientTimeout(total=5)
-            ) as resp:
-                result = await resp.json()
-                return result.get("status") == "healthy"
-        except Exception as e:
-            print(f"  Error: {e}")
+            with open(SECURITY_CACHE_FILE, "rb") as f:
+                data = orjson.loads(f.read())
+            if time.time() - data["ts"] >= SECURITY_CACHE_TTL:
+                return False
+            cookies = data["cookies"]
+        except (OSError, ValueError, KeyError, TypeError):
             return False
+        self._apply_cookies(cookies)
+        return True
+
+    def _save_security_cookies(self) -> None:
+        """写入安全 cookies 磁盘缓存 (先写临时文件再重命名，避免读到半个文件)"""
+        tmp_file = f"{SECURITY_CACHE_FILE}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(SECURITY_CACHE_FILE), exist_ok=True)
+            with open(tmp_file, "wb") as f:
+                f.write(orjson.dumps({"ts": time.time(), "cookies": self.cookies}))
+            os.replace(tmp_file, SECURITY_CACHE_FILE)
+        except OSError:
+            pass
+
+    @staticmethod
+    def clear_security_cache() -> None:
+        """删除安全 cookies 磁盘缓存 (被小红书拒绝时)"""
+        try:
+            os.remove(SECURITY_CACHE_FILE)
+        except OSError:
+            pass
 
-    async def fetch_security_cookies(self, session: aiohttp.ClientSession) -> bool:
+    async def fetch_security_cookies(self) -> bool:
         """从签名服务获取安全 cookies (a1, webId, gid 等)"""
         try:
+            session = await self._get_session()
             async with session.get(
                 f"{self.sign_service_url}/api/cookies",
-                timeout=aiohttp.ClientTimeout(total=10)
+                timeout=self._TIMEOUT_COOKIES
             ) as resp:
-                result = await resp.json()
-                print(f"  Sign Service Cookies Response: {json.dumps(result, indent=2, ensure_ascii=False)}")
+                result = orjson.loads(await resp.read())
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Sign Service Cookies Response: %s", json.dumps(result, indent=2))
 
                 if not result.get("success"):
                     print(f"  Error: {result.get('error', 'Unknown')}")
                     return False
 
-                all_cookies = result.get("all_cookies", {})
-
-                # 获取所有安全 cookies
-                self.security_cookies = dict(all_cookies)
-
-                # 确保 xsecappid 设置为 xhs-pc-web (Web 端)
-                self.security_cookies["xsecappid"] = "xhs-pc-web"
+                # 获取所有安全 cookies (xsecappid 由 _apply_cookies 固定为 xhs-pc-web)
+                self._apply_cookies(dict(result.get("all_cookies", {})))
+                self._save_security_cookies()
 
                 return True
 
@@ -105,15 +148,17 @@ class XHSUserPostedClient:
             return False
 
 
-    async def get_signature(self, session: aiohttp.ClientSession, url: str, data: str = "") -> dict:
+    async def get_signature(self, url: str, data: str = "") -> dict:
         """获取 XYS 签名"""
+        session = await self._get_session()
         async with session.post(
             f"{self.sign_service_url}/api/sign/xys",
             json={"url": url, "data": data},
-            timeout=aiohttp.ClientTimeout(total=30)
+            timeout=self._TIMEOUT_SIGN
         ) as resp:
-            result = await resp.json()
-            print(f"  Sign Service Signature Response: {json.dumps(result, indent=2, ensure_ascii=False)}")
+            result = orjson.loads(await resp.read())
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Sign Service Signature Response: %s", json.dumps(result, indent=2))
             if not result.get("success"):
                 raise Exception(f"Sign failed: {result.get('error', 'Unknown')}")
             return {
@@ -122,9 +167,42 @@ class XHSUserPostedClient:
                 "X-s-common": result.get("X-s-common", "")
             }
 
+    def _user_posted_url(self, user_id: str, num: int, cursor: Optional[str]) -> str:
+        """构建 user_posted 接口路径与查询参数"""
+        # 手动拼接以避免 urlencode 对逗号进行编码 (cursor 放在最前面)
+        query_string = f"num={num}&user_id={user_id}&{self._STATIC_QS}"
+        if cursor:
+            query_string = f"cursor={cursor}&{query_string}"
+        return f"{self.USER_POSTED_PATH}?{query_string}"
+
+    async def _fetch_user_posted(self, api_url: str, sign_data: dict) -> dict:
+        """使用已获取的签名请求 user_posted 接口"""
+        await self.limiter.acquire()
+
+        headers = {
+            "Cookie": self._build_cookie_string(),
+            "X-s": sign_data["X-s"],
+            "X-t": sign_data["X-t"],
+            "X-s-common": sign_data["X-s-common"],
+        }
+
+        # Debug: 打印请求信息
+        print(f"  API URL: {api_url[:80]}...")
+
+        session = await self._get_session()
+        async with session.get(
+            f"{self.base_url}{api_url}",
+            headers=headers,
+            timeout=self._TIMEOUT_API
+        ) as resp:
+            self.limiter.observe(resp.headers)
+            if resp.status in (401, 403):
+                # 缓存的安全 cookies 可能已失效，下次运行重新获取
+                self.clear_security_cache()
+            return orjson.loads(await resp.read())
+
     async def get_user_posted(
         self,
-        session: aiohttp.ClientSession,
         user_id: str,
         num: int = 30,
         cursor: Optional[str] = None
@@ -137,62 +215,131 @@ class XHSUserPostedClient:
             num: 每页数量 (默认 30)
             cursor: 分页游标 (用于获取下一页)
         """
-        # 构建查询参数 - 手动构建以避免 urlencode 对逗号进行编码
-        parts = [
-            f"num={num}",
-            f"user_id={user_id}",
-            "image_formats=jpg,webp,avif",
-        ]
+        api_url = self._user_posted_url(user_id, num, cursor)
 
-        if cursor:
-            # cursor 放在最前面
-            parts.insert(0, f"cursor={cursor}")
+        # 获取签名 (GET 请求，data 为空)
+        sign_data = await self.get_signature(api_url, "")
 
-        query_string = "&".join(parts)
-        api_url = f"/api/sns/web/v1/user_posted?{query_string}"
+        return await self._fetch_user_posted(api_url, sign_data)
 
-        # 获取签名 (GET 请求，data 为空)
-        sign_data = await self.get_signature(session, api_url, "")
+    async def iter_user_posted(
+        self,
+        user_id: str,
+        num: int = 30,
+        cursor: Optional[str] = None
+    ) -> AsyncIterator[dict]:
+        """
+        逐页获取博主的全部笔记，逐条返回
 
-        headers = {
-            **self.headers,
-            "Cookie": self._build_cookie_string(),
-            "X-s": sign_data["X-s"],
-            "X-t": sign_data["X-t"],
-            "X-s-common": sign_data["X-s-common"],
-        }
+        拿到下一页的 cursor 后立即在后台获取下一页签名，
+        调用方处理当前页笔记期间签名已在进行。
 
-        # Debug: 打印请求信息
-        print(f"  API URL: {api_url[:80]}...")
+        Args:
+            user_id: 博主用户 ID
+            num: 每页数量 (默认 30)
+            cursor: 起始分页游标
 
-        async with session.get(
-            f"{self.base_url}{api_url}",
-            headers=headers,
-            timeout=aiohttp.ClientTimeout(total=30)
-        ) as resp:
-            return await resp.json()
+        Raises:
+            Exception: 某一页获取失败
+        """
+        api_url = self._user_posted_url(user_id, num, cursor)
+        sign_task = asyncio.create_task(self.get_signature(api_url, ""))
 
-    def load_cookies_from_file(self, filename: str = "login_cookies.json") -> bool:
-        """从文件加载登录 cookies"""
         try:
-            with open(filename, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                cookies = data.get("cookies", {})
-                # 更新用户 cookies (排除安全类 cookies)
-                security_keys = ["a1", "webId", "gid", "websectiga", "sec_poison_id", "acw_tc", "loadts", "xsecappid"]
-                for k, v in cookies.items():
-                    if k not in security_keys:
-                        self.user_cookies[k] = v
-                return True
-        except FileNotFoundError:
-            return False
-        except Exception as e:
-            print(f"  Load cookies error: {e}")
-            return False
+            while sign_task is not None:
+                result = await self._fetch_user_posted(api_url, await sign_task)
+                sign_task = None
+
+                if not result.get("success"):
+                    raise Exception(f"Fetch failed: {result.get('msg') or result}")
+
+                data = result.get("data", {})
+                next_cursor = data.get("cursor", "")
+                if data.get("has_more", False) and next_cursor:
+                    # 下一页签名与当前页的处理并行
+                    api_url = self._user_posted_url(user_id, num, next_cursor)
+                    sign_task = asyncio.create_task(self.get_signature(api_url, ""))
+
+                for note in data.get("notes", []):
+                    yield note
+        finally:
+            # 提前结束时取消预取的签名；已完成的取走结果，避免未取回异常的警告
+            if sign_task is not None:
+                if not sign_task.done():
+                    sign_task.cancel()
+                elif not sign_task.cancelled():
+                    sign_task.exception()
+
+    async def crawl_many(
+        self,
+        user_ids: List[str],
+        num: int = 30,
+        concurrency: int = DEFAULT_CONCURRENCY
+    ) -> Dict[str, dict]:
+        """
+        并发获取多个博主的第一页笔记
+
+        同时进行的请求数不超过 concurrency，使签名服务的多个浏览器实例
+        并行签名；所有请求共用同一个会话。
 
+        Args:
+            user_ids: 博主用户 ID 列表
+            num: 每页数量 (默认 30)
+            concurrency: 最大并发数
 
-async def main(user_id: str, num: int = 30, cursor: Optional[str] = None):
-    """获取博主笔记"""
+        Returns:
+            user_id -> 接口响应 (出错时为 {"success": False, "msg": 错误信息})
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch_one(user_id: str) -> dict:
+            async with semaphore:
+                try:
+                    return await self.get_user_posted(user_id, num=num)
+                except Exception as e:
+                    return {"success": False, "msg": str(e)}
+
+        results = await asyncio.gather(*(fetch_one(user_id) for user_id in user_ids))
+        return dict(zip(user_ids, results))
+
+
+def format_note(i: int, note: dict) -> str:
+    """格式化一条笔记 (多行，末尾带空行)"""
+    note_id = note.get("note_id", "")
+    title = note.get("display_title", "无标题")
+    note_type = note.get("type", "unknown")
+    user = note.get("user", {})
+    nickname = user.get("nickname", "未知用户")
+    liked_count = note.get("interact_info", {}).get("liked_count", "0")
+    xsec_token = note.get("xsec_token", "")
+
+    type_emoji = "[VIDEO]" if note_type == "video" else "[IMAGE]"
+
+    lines = [
+        f"{i:2d}. {type_emoji} [{note_id[:12]}...]",
+        f"    [NOTE] {title[:50]}",
+        f"    [USER] {nickname} | [LIKE] {liked_count}",
+    ]
+    if xsec_token:
+        lines.append(f"    [KEY] xsec_token: {xsec_token[:20]}...")
+    lines.append("")
+    return "\n".join(lines)
+
+
+def print_notes(notes: List[dict]) -> None:
+    """打印一页笔记 (拼接后一次输出)"""
+    if notes:
+        print("\n".join(format_note(i, note) for i, note in enumerate(notes, 1)))
+
+
+async def main(
+    user_id: str,
+    num: int = 30,
+    cursor: Optional[str] = None,
+    all_pages: bool = False,
+    concurrency: int = XHSUserPostedClient.DEFAULT_CONCURRENCY
+):
+    """获取博主笔记 (user_id 可用逗号分隔多个)"""
     print("=" * 60)
     print("  小红书博主笔记获取")
     print("=" * 60)
@@ -208,10 +355,14 @@ async def main(user_id: str, num: int = 30, cursor: Optional[str] = None):
         return
     print()
 
-    async with aiohttp.ClientSession() as session:
+    if client.load_cached_security_cookies():
+        # 缓存有效时跳过 Step 1 与 Step 2
+        print("[1/3] 检查签名服务... 跳过")
+        print("\n[2/3] 获取安全 cookies... 使用缓存")
+    else:
         # Step 1: 检查签名服务
         print("[1/3] 检查签名服务...")
-        if not await client.check_sign_service(session):
+        if not await client.check_sign_service():
             print("  [FAILED] 签名服务未运行")
             print("  请先启动: python server.py")
             return
@@ -219,73 +370,87 @@ async def main(user_id: str, num: int = 30, cursor: Optional[str] = None):
 
         # Step 2: 获取安全 cookies
         print("\n[2/3] 获取安全 cookies...")
-        if not await client.fetch_security_cookies(session):
+        if not await client.fetch_security_cookies():
             print("  [FAILED] 获取失败")
             return
-        print(f"  [OK] a1: {client.security_cookies.get('a1', '')[:20]}...")
-        print(f"  [OK] webId: {client.security_cookies.get('webId', '')[:20]}...")
-
-        # Step 3: 获取博主笔记
-        cursor_info = f" (cursor: {cursor[:16]}...)" if cursor else ""
-        print(f"\n[3/3] 获取博主笔记: {user_id}{cursor_info}...")
-
-        try:
-            result = await client.get_user_posted(
-                session,
-                user_id=user_id,
-                num=num,
-                cursor=cursor
-            )
-
+    print(f"  [OK] a1: {client.cookies.get('a1', '')[:20]}...")
+    print(f"  [OK] webId: {client.cookies.get('webId', '')[:20]}...")
+
+    # Step 3: 获取博主笔记
+    user_ids = [uid for uid in user_id.split(",") if uid]
+    if len(user_ids) > 1:
+        print(f"\n[3/3] 并发获取 {len(user_ids)} 位博主的笔记 (并发数 {concurrency})...")
+        results = await client.crawl_many(user_ids, num=num, concurrency=concurrency)
+        for uid, result in results.items():
             print()
             print("=" * 60)
-
             if result.get("success"):
-                data = result.get("data", {})
-                notes = data.get("notes", [])
-                next_cursor = data.get("cursor", "")
-                has_more = data.get("has_more", False)
-
-                print(f"  [SUCCESS] 获取成功! 共 {len(notes)} 条笔记")
+                notes = result.get("data", {}).get("notes", [])
+                print(f"  [SUCCESS] {uid}: 共 {len(notes)} 条笔记")
                 print("=" * 60)
                 print()
-
-                for i, note in enumerate(notes, 1):
-                    note_id = note.get("note_id", "")
-                    title = note.get("display_title", "无标题")
-                    note_type = note.get("type", "unknown")
-                    user = note.get("user", {})
-                    nickname = user.get("nickname", "未知用户")
-                    liked_count = note.get("interact_info", {}).get("liked_count", "0")
-                    xsec_token = note.get("xsec_token", "")
-
-                    type_emoji = "[VIDEO]" if note_type == "video" else "[IMAGE]"
-
-                    print(f"{i:2d}. {type_emoji} [{note_id[:12]}...]")
-                    print(f"    [NOTE] {title[:50]}")
-                    print(f"    [USER] {nickname} | [LIKE] {liked_count}")
-                    if xsec_token:
-                        print(f"    [KEY] xsec_token: {xsec_token[:20]}...")
-                    print()
-
-                if has_more and next_cursor:
-                    print("-" * 60)
-                    print(f"[TIP] 还有更多笔记，使用以下命令获取下一页:")
-                    print(f"   python test_user_posted.py --user-id {user_id} --cursor \"{next_cursor}\"")
-                    print()
-                elif not has_more:
-                    print("-" * 60)
-                    print("[END] 已获取所有笔记")
-
+                print_notes(notes)
             else:
-                print("  [FAILED] 获取失败")
+                print(f"  [FAILED] {uid}: {result.get('msg') or result}")
                 print("=" * 60)
-                print(f"\n响应: {json.dumps(result, indent=2, ensure_ascii=False)}")
+        return
 
+    cursor_info = f" (cursor: {cursor[:16]}...)" if cursor else ""
+    print(f"\n[3/3] 获取博主笔记: {user_id}{cursor_info}...")
+
+    if all_pages:
+        # 同一会话内自动翻页，直到没有更多笔记
+        count = 0
+        try:
+            async for note in client.iter_user_posted(user_id, num=num, cursor=cursor):
+                count += 1
+                print(format_note(count, note))
         except Exception as e:
             print(f"  [FAILED] 获取出错: {e}")
-            import traceback
-            traceback.print_exc()
+        print("-" * 60)
+        print(f"[END] 共获取 {count} 条笔记")
+        return
+
+    try:
+        result = await client.get_user_posted(
+            user_id=user_id,
+            num=num,
+            cursor=cursor
+        )
+
+        print()
+        print("=" * 60)
+
+        if result.get("success"):
+            data = result.get("data", {})
+            notes = data.get("notes", [])
+            next_cursor = data.get("cursor", "")
+            has_more = data.get("has_more", False)
+
+            print(f"  [SUCCESS] 获取成功! 共 {len(notes)} 条笔记")
+            print("=" * 60)
+            print()
+
+            print_notes(notes)
+
+            if has_more and next_cursor:
+                print("-" * 60)
+                print(f"[TIP] 还有更多笔记，使用以下命令获取下一页:")
+                print(f"   python test_user_posted.py --user-id {user_id} --cursor \"{next_cursor}\"")
+                print()
+            elif not has_more:
+                print("-" * 60)
+                print("[END] 已获取所有笔记")
+
+        else:
+            print("  [FAILED] 获取失败")
+            print("=" * 60)
+            print(f"\n响应: {json.dumps(result, indent=2, ensure_ascii=False)}")
+
+    except Exception as e:
+        print(f"  [FAILED] 获取出错: {e}")
+        import traceback
+        traceback.print_exc()
 
 
 def print_usage():
@@ -296,12 +461,17 @@ def print_usage():
   python test_user_posted.py --user-id <用户ID>
   python test_user_posted.py --user-id <用户ID> --num 30
   python test_user_posted.py --user-id <用户ID> --cursor <游标>
+  python test_user_posted.py --user-id <用户ID> --all
+  python test_user_posted.py --user-id <用户ID1>,<用户ID2>,<用户ID3>
   python test_user_posted.py --help
 
 参数:
-  --user-id ID       博主用户 ID (必填)
+  --user-id ID       博主用户 ID (必填，多个用逗号分隔)
   --num N            每页数量 (默认: 30)
   --cursor STR       分页游标 (用于获取下一页)
+  --all              自动翻页获取全部笔记
+  --concurrency N    多个博主时的并发数 (默认: 5)
+  --debug            打印签名服务的原始响应
 
 示例:
   python test_user_posted.py --user-id 5c2686820000000007031438
@@ -312,47 +482,36 @@ def print_usage():
 """)
 
 
-def parse_args():
-    """解析命令行参数"""
-    args = {
-        "user_id": None,
-        "num": 30,
-        "cursor": None,
-    }
-
-    argv = sys.argv[1:]
-    i = 0
-    while i < len(argv):
-        if argv[i] in ["--help", "-h"]:
-            return None
-        elif argv[i] == "--user-id" and i + 1 < len(argv):
-            args["user_id"] = argv[i + 1]
-            i += 2
-        elif argv[i] == "--num" and i + 1 < len(argv):
-            try:
-                args["num"] = int(argv[i + 1])
-            except ValueError:
-                print("错误: --num 需要一个数字参数")
-                sys.exit(1)
-            i += 2
-        elif argv[i] == "--cursor" and i + 1 < len(argv):
-            args["cursor"] = argv[i + 1]
-            i += 2
-        else:
-            i += 1
-
-    return args
+def parse_args() -> argparse.Namespace:
+    """解析命令行参数 (帮助信息由 print_usage 输出)"""
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("-h", "--help", action="store_true")
+    parser.add_argument("--user-id")
+    parser.add_argument("--num", type=int, default=30)
+    parser.add_argument("--cursor")
+    parser.add_argument("--all", action="store_true", dest="all_pages")
+    parser.add_argument(
+        "--concurrency", type=int, default=XHSUserPostedClient.DEFAULT_CONCURRENCY
+    )
+    parser.add_argument("--debug", action="store_true")
+    return parser.parse_args()
 
 
 if __name__ == "__main__":
     args = parse_args()
 
-    if args is None or args["user_id"] is None:
+    if args.help or args.user_id is None:
         print_usage()
         sys.exit(0)
 
-    asyncio.run(main(
-        user_id=args["user_id"],
-        num=args["num"],
-        cursor=args["cursor"]
+    if args.debug:
+        logging.basicConfig(format="  %(message)s")
+        logger.setLevel(logging.DEBUG)
+
+    run(main(
+        user_id=args.user_id,
+        num=args.num,
+        cursor=args.cursor,
+        all_pages=args.all_pages,
+        concurrency=args.concurrency
     ))
@@ -0,0 +1,407 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+小红书 Sign Service 客户端公共模块
+
+test_login.py / test_search.py / test_user_posted.py 共用：
+1. 模块级共享 ClientSession (复用 keep-alive 连接)
+2. 签名服务健康检查 (带跨进程可用标记)
+3. 获取浏览器 cookies 与 XYS 签名 (带签名缓存)
+4. Cookie / 签名请求头构建
+5. 小红书接口请求限速 (滑动窗口 RPM)
+
+依赖：
+    pip install aiohttp orjson
+    pip install uvloop  # 可选，更快的事件循环
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Awaitable, Dict, Mapping, Optional, Tuple
+
+import aiohttp
+import orjson
+from aiohttp import hdrs
+from multidict import CIMultiDict
+
+try:
+    import uvloop
+except ImportError:  # 可选依赖 (Windows 无 uvloop)
+    uvloop = None
+
+
+# 签名缓存有效期 (秒)，X-t 时效较短，超时后重新签名
+SIGN_CACHE_TTL = 60
+
+# 最近一次签名服务可用的时间戳文件，TTL 内跳过健康检查 (多次运行共享)
+HEALTH_MARK_FILE = os.path.join(os.path.expanduser("~"), ".xhs_sign_health")
+HEALTH_MARK_TTL = 30
+
+# 由签名服务提供的安全类 cookies (不从登录文件加载)
+SECURITY_COOKIE_KEYS = frozenset({
+    "a1", "webId", "gid", "websectiga", "sec_poison_id", "acw_tc", "loadts", "xsecappid",
+})
+
+
+def _recently_healthy() -> bool:
+    """签名服务是否在 HEALTH_MARK_TTL 内确认可用"""
+    try:
+        with open(HEALTH_MARK_FILE, "r", encoding="utf-8") as f:
+            return time.time() - float(f.read()) < HEALTH_MARK_TTL
+    except (OSError, ValueError):
+        return False
+
+
+def _mark_healthy() -> None:
+    """记录签名服务可用的时间"""
+    try:
+        with open(HEALTH_MARK_FILE, "w", encoding="utf-8") as f:
+            f.write(str(time.time()))
+    except OSError:
+        pass
+
+
+def _clear_healthy() -> None:
+    """清除可用记录 (连接失败时)"""
+    try:
+        os.remove(HEALTH_MARK_FILE)
+    except OSError:
+        pass
+
+
+def _orjson_dumps(obj) -> str:
+    """aiohttp json= 序列化 (aiohttp 要求返回 str)"""
+    return orjson.dumps(obj).decode()
+
+
+def create_connector() -> aiohttp.TCPConnector:
+    """创建 TCP 连接器 (DNS 缓存 + 长 keep-alive，aiohttp 已默认开启 TCP_NODELAY)"""
+    return aiohttp.TCPConnector(
+        limit=100,
+        limit_per_host=20,
+        ttl_dns_cache=300,
+        use_dns_cache=True,
+        force_close=False,
+        keepalive_timeout=75,
+        enable_cleanup_closed=True,
+    )
+
+
+# 模块级共享会话 (复用签名服务与小红书的 keep-alive 连接)
+_session: Optional[aiohttp.ClientSession] = None
+
+# 会话默认超时 (单个请求未指定 timeout 时生效)
+SESSION_TIMEOUT = aiohttp.ClientTimeout(total=30, connect=10)
+
+
+async def get_session(headers: Optional[Mapping[str, str]] = None) -> aiohttp.ClientSession:
+    """获取共享 ClientSession (首次调用时创建)
+
+    Args:
+        headers: 创建会话时设置的默认请求头 (会话已存在时忽略)
+    """
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            connector=create_connector(),
+            timeout=SESSION_TIMEOUT,
+            headers=headers,
+            json_serialize=_orjson_dumps,
+        )
+    return _session
+
+
+async def close_session() -> None:
+    """关闭共享 ClientSession"""
+    global _session
+    if _session is not None:
+        await _session.close()
+        _session = None
+
+
+class SlidingWindowLimiter:
+    """滑动窗口限速：任意 60 秒内最多 rpm 次请求
+
+    服务端返回 Retry-After 时调用 backoff，暂停后续请求并降低 rpm。
+    """
+
+    WINDOW = 60.0
+
+    def __init__(self, rpm: int):
+        self.rpm = rpm
+        self.stamps: deque = deque()
+        self._blocked_until = 0.0
+
+    async def acquire(self) -> None:
+        """等待直到可以发出下一次请求"""
+        loop = asyncio.get_running_loop()
+        while True:
+            now = loop.time()
+            if now < self._blocked_until:
+                await asyncio.sleep(self._blocked_until - now)
+                continue
+
+            while self.stamps and now - self.stamps[0] >= self.WINDOW:
+                self.stamps.popleft()
+            if len(self.stamps) < self.rpm:
+                self.stamps.append(now)
+                return
+            await asyncio.sleep(self.WINDOW - (now - self.stamps[0]))
+
+    def backoff(self, retry_after: float) -> None:
+        """服务端要求限速：retry_after 秒内不再请求，rpm 减半"""
+        loop = asyncio.get_running_loop()
+        self._blocked_until = max(self._blocked_until, loop.time() + retry_after)
+        self.rpm = max(1, self.rpm // 2)
+
+    def observe(self, headers) -> None:
+        """从响应头读取 Retry-After (秒数)，存在时退避"""
+        value = headers.get(hdrs.RETRY_AFTER)
+        if not value:
+            return
+        try:
+            self.backoff(float(value))
+        except ValueError:
+            # HTTP 日期格式，按一个窗口退避
+            self.backoff(self.WINDOW)
+
+
+async def _run_and_close(entry: Awaitable[None]) -> None:
+    """运行入口协程，结束后关闭共享会话"""
+    try:
+        await entry
+    finally:
+        await close_session()
+
+
+def run(entry: Awaitable[None]) -> None:
+    """启动脚本入口协程 (安装了 uvloop 时使用 uvloop 事件循环)"""
+    if uvloop is not None:
+        uvloop.run(_run_and_close(entry))
+    else:
+        asyncio.run(_run_and_close(entry))
+
+
+class XHSSignClient:
+    """Sign Service 客户端基类
+
+    子类设置 self.headers (固定请求头)，并按需覆盖 XSECAPPID、
+    XS_COMMON_HEADER 与 _apply_cookies。
+    """
+
+    # 请求超时 (复用同一对象，避免每次请求重新构造)
+    _TIMEOUT_HEALTH = aiohttp.ClientTimeout(total=5)
+    _TIMEOUT_COOKIES = aiohttp.ClientTimeout(total=10)
+    _TIMEOUT_SIGN = aiohttp.ClientTimeout(total=30)
+    _TIMEOUT_API = aiohttp.ClientTimeout(total=30)
+
+    # 固定 cookie xsecappid 的值
+    XSECAPPID = "xhs-pc-web"
+
+    # X-s-common 请求头的写法
+    XS_COMMON_HEADER = "X-s-common"
+
+    def __init__(
+        self,
+        sign_service_url: str = "http://localhost:8080",
+        session: Optional[aiohttp.ClientSession] = None,
+    ):
+        self.sign_service_url = sign_service_url
+        self.session = session
+
+        # 从签名服务获取的 cookies
+        self.cookies: Dict[str, str] = {}
+
+        # 用户登录 cookies (从 login_cookies.json 加载，覆盖同名 cookies)
+        self.user_cookies: Dict[str, str] = {}
+
+        # 合并后的 Cookie 请求头 (cookies 更新时置为 None)
+        self._cookie_header: Optional[str] = None
+
+        # 签名缓存: (url, data) -> (X-s, X-t, X-s-common, 签名时间)
+        self._sign_cache: Dict[Tuple[str, str], Tuple[str, str, str, float]] = {}
+
+        # 请求头 (固定部分，由子类填充)
+        self.headers: CIMultiDict = CIMultiDict()
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """获取 HTTP 会话 (未传入时使用模块级共享会话)"""
+        if self.session is None:
+            self.session = await get_session()
+        return self.session
+
+    def _signed_headers(self, sign_data: dict) -> CIMultiDict:
+        """在固定请求头上追加 Cookie 与签名字段"""
+        headers = self.headers.copy()
+        headers[hdrs.COOKIE] = self._build_cookie_string()
+        headers["X-s"] = sign_data["X-s"]
+        headers["X-t"] = sign_data["X-t"]
+        headers[self.XS_COMMON_HEADER] = sign_data["X-s-common"]
+        return headers
+
+    def _build_cookie_string(self) -> str:
+        """合并签名服务 cookies 和用户 cookies (缓存，cookies 更新时失效)"""
+        if self._cookie_header is None:
+            all_cookies = {**self.cookies, **self.user_cookies}
+            self._cookie_header = "; ".join(f"{k}={v}" for k, v in all_cookies.items())
+        return self._cookie_header
+
+    def _apply_cookies(self, all_cookies: Dict[str, str]) -> None:
+        """保存从签名服务获取的 cookies"""
+        all_cookies["xsecappid"] = self.XSECAPPID
+        self.cookies = all_cookies
+        self._cookie_header = None
+
+    def load_cookies_from_file(self, filename: str = "login_cookies.json") -> bool:
+        """从文件加载登录 cookies"""
+        try:
+            with open(filename, "rb") as f:
+                data = orjson.loads(f.read())
+            cookies = data.get("cookies", {})
+            # 更新用户 cookies (排除安全类 cookies)
+            self.user_cookies.update({
+                k: v for k, v in cookies.items() if k not in SECURITY_COOKIE_KEYS
+            })
+            self._cookie_header = None
+            return True
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            print(f"  Load cookies error: {e}")
+            return False
+
+    async def check_sign_service(self) -> bool:
+        """检查签名服务是否可用 (最近确认可用时跳过)"""
+        if _recently_healthy():
+            return True
+
+        try:
+            session = await self._get_session()
+            async with session.get(
+                f"{self.sign_service_url}/api/health",
+                timeout=self._TIMEOUT_HEALTH
+            ) as resp:
+                result = orjson.loads(await resp.read())
+                healthy = result.get("status") == "healthy"
+                if healthy:
+                    _mark_healthy()
+                return healthy
+        except Exception as e:
+            print(f"  Error: {e}")
+            return False
+
+    async def warm_up(self) -> None:
+        """预热签名服务连接 (等待用户输入时后台执行，忽略错误)"""
+        try:
+            session = await self._get_session()
+            async with session.get(
+                f"{self.sign_service_url}/api/health",
+                timeout=self._TIMEOUT_HEALTH
+            ) as resp:
+                await resp.read()
+        except Exception:
+            pass
+
+    async def fetch_cookies(self) -> bool:
+        """从签名服务获取所有 cookies"""
+        error = await self.fetch_cookies_quietly()
+        if error:
+            print(f"  {error}")
+        return error is None
+
+    async def fetch_cookies_quietly(self) -> Optional[str]:
+        """从签名服务获取所有 cookies，不输出；失败时返回错误信息
+
+        供与其他步骤并发获取时使用，错误信息由调用方在合适的位置输出。
+        """
+        try:
+            session = await self._get_session()
+            async with session.get(
+                f"{self.sign_service_url}/api/cookies",
+                timeout=self._TIMEOUT_COOKIES
+            ) as resp:
+                result = orjson.loads(await resp.read())
+
+                if not result.get("success"):
+                    return f"Error: {result.get('error', 'Unknown error')}"
+
+                self._apply_cookies(result.get("all_cookies", {}))
+                return None
+
+        except Exception as e:
+            return f"Error fetching cookies: {e}"
+
+    def _get_cached_sign(self, url: str, data: str) -> Optional[dict]:
+        """查找未过期的签名缓存"""
+        hit = self._sign_cache.get((url, data))
+        if hit and time.monotonic() - hit[3] < SIGN_CACHE_TTL:
+            return {"X-s": hit[0], "X-t": hit[1], "X-s-common": hit[2]}
+        return None
+
+    def _cache_sign(self, url: str, data: str, sign_data: dict) -> dict:
+        """写入签名缓存"""
+        self._sign_cache[(url, data)] = (
+            sign_data["X-s"],
+            sign_data["X-t"],
+            sign_data["X-s-common"],
+            time.monotonic(),
+        )
+        return sign_data
+
+    async def _post_sign_service(self, path: str, payload: dict) -> dict:
+        """POST 到签名服务，连接失败时重新检查服务并重试一次"""
+        session = await self._get_session()
+        for attempt in range(2):
+            try:
+                async with session.post(
+                    f"{self.sign_service_url}{path}",
+                    json=payload,
+                    timeout=self._TIMEOUT_SIGN
+                ) as resp:
+                    result = orjson.loads(await resp.read())
+                    if result.get("success"):
+                        _mark_healthy()
+                    return result
+            except aiohttp.ClientConnectionError:
+                _clear_healthy()
+                if attempt or not await self.check_sign_service():
+                    raise
+
+    async def fetch_cookies_and_sign(self, url: str, data: str) -> dict:
+        """获取 XYS 签名，尚无 cookies 时一并获取 (单次请求)"""
+        want_cookies = not self.cookies
+        if not want_cookies:
+            cached = self._get_cached_sign(url, data)
+            if cached:
+                return cached
+
+        result = await self._post_sign_service(
+            "/api/sign/prepare",
+            {"url": url, "data": data, "want_cookies": want_cookies},
+        )
+        if not result.get("success"):
+            raise Exception(f"Sign failed: {result.get('error', 'Unknown')}")
+        if want_cookies:
+            self._apply_cookies(result.get("all_cookies", {}))
+        return self._cache_sign(url, data, {
+            "X-s": result["X-s"],
+            "X-t": result["X-t"],
+            "X-s-common": result.get("X-s-common", "")
+        })
+
+    async def get_signature(self, url: str, data: str) -> dict:
+        """获取 XYS 签名 (相同 url 与 data 在 SIGN_CACHE_TTL 内复用)"""
+        cached = self._get_cached_sign(url, data)
+        if cached:
+            return cached
+
+        result = await self._post_sign_service("/api/sign/xys", {"url": url, "data": data})
+        if not result.get("success"):
+            raise Exception(f"Sign failed: {result.get('error', 'Unknown')}")
+        return self._cache_sign(url, data, {
+            "X-s": result["X-s"],
+            "X-t": result["X-t"],
+            "X-s-common": result.get("X-s-common", "")
+        })
@@ -6,7 +6,7 @@ Manages multiple browser instances for load balancing and high availability.
 
 import asyncio
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple, Set, Callable, Awaitable
 from collections import deque
 
 import structlog
@@ -23,13 +23,97 @@ from config import get_config
 logger = structlog.get_logger()
 
 
+class AIMDLimiter:
+    """
+    Concurrency limit with additive increase / multiplicative decrease.
+
+    Each fast success raises the limit by `increase`; each failure
+    multiplies it by `decrease`. Waiters are admitted in FIFO order.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        maximum: int,
+        minimum: int = 1,
+        target_latency: float = 2.0,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+    ):
+        """
+        Initialize the limiter.
+
+        Args:
+            initial: Starting concurrency limit
+            maximum: Upper bound for the limit
+            minimum: Lower bound for the limit
+            target_latency: Successes slower than this (seconds) do not grow the limit
+            increase: Additive step on success
+            decrease: Multiplicative factor on failure
+        """
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_latency = target_latency
+        self.increase = increase
+        self.decrease = decrease
+
+        self.limit = float(max(minimum, min(initial, maximum)))
+        self._in_flight = 0
+        self._waiters: deque = deque()
+
+    async def acquire(self) -> None:
+        """Wait for a free slot."""
+        if not self._waiters and self._in_flight < int(self.limit):
+            self._in_flight += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Slot was granted just before cancellation; hand it on
+                self._in_flight -= 1
+                self._wake()
+            else:
+                self._waiters.remove(future)
+            raise
+
+    def release(self, success: bool, latency: float) -> None:
+        """Free a slot and adjust the limit from the outcome."""
+        self._in_flight -= 1
+
+        if not success:
+            self.limit = max(self.minimum, self.limit * self.decrease)
+        elif latency <= self.target_latency:
+            self.limit = min(self.maximum, self.limit + self.increase)
+
+        self._wake()
+
+    def _wake(self) -> None:
+        """Admit waiters while there is room under the limit."""
+        while self._waiters and self._in_flight < int(self.limit):
+            future = self._waiters.popleft()
+            if not future.done():
+                self._in_flight += 1
+                future.set_result(None)
+
+
+def _can_sign(instance: XYSSignService) -> bool:
+    """READY, or lazy and not launched yet (its first sign() starts it)."""
+    return instance.status == InstanceStatus.READY or (
+        instance.lazy and instance.status == InstanceStatus.STOPPED
+    )
+
+
 class XYSSignManager:
     """
     Manages multiple XYSSignService instances.
 
     Features:
     - Instance pool management
-    - Round-robin load balancing
+    - Ready queue for exclusive signing (round-robin for shared lookups)
     - Automatic instance recovery
     - Health monitoring
     """
@@ -37,6 +121,17 @@ class XYSSignManager:
     # Default configuration
     DEFAULT_MAX_INSTANCES = 5
     DEFAULT_MIN_INSTANCES = 2
+    DEFAULT_SIGN_TIMEOUT = 5000
+    DEFAULT_SIGN_PAGES = 2
+
+    # AIMD signing concurrency: limit may grow to max_instances * factor
+    AIMD_MAX_FACTOR = 2
+    AIMD_TARGET_LATENCY = 2.0
+
+    # Circuit breaker: consecutive signing failures before an instance is
+    # taken out of rotation, and seconds before it gets one probe request
+    CIRCUIT_FAILURE_THRESHOLD = 5
+    CIRCUIT_COOLDOWN = 30.0
 
     def __init__(
         self,
@@ -45,6 +140,9 @@ class XYSSignManager:
         headless: bool = True,
         default_proxy: Optional[Dict[str, str]] = None,
         browser_executable: Optional[str] = None,
+        sign_timeout: int = DEFAULT_SIGN_TIMEOUT,
+        sign_pages: int = DEFAULT_SIGN_PAGES,
+        lazy: bool = False,
     ):
         """
         Initialize XYS sign service manager.
@@ -55,15 +153,37 @@ class XYSSignManager:
             headless: Run browsers in headless mode
             default_proxy: Default proxy configuration
             browser_executable: Path to browser executable
+            sign_timeout: Max time in ms to wait for a free instance
+            sign_pages: Signing pages per instance
+            lazy: Create instances without a browser; each one launches on
+                its first signing request
         """
         self.max_instances = max_instances
         self.min_instances = min_instances
         self.headless = headless
         self.default_proxy = default_proxy
         self.browser_executable = browser_executable
+        self.sign_timeout = sign_timeout
+        self.sign_pages = max(1, sign_pages)
+        self.lazy = lazy
 
         self._instances: Dict[str, XYSSignService] = {}
-        self._instance_queue: deque = deque()
+        # Round-robin order of instance IDs (insertion-ordered dict, O(1) removal)
+        self._rotation: Dict[str, None] = {}
+        # Free signing slots as instance IDs, one per idle page; a signer
+        # takes one and puts it back
+        self._ready: asyncio.Queue = asyncio.Queue()
+        # Slots per instance ID that are queued or borrowed (at most its page count)
+        self._slots: Dict[str, int] = {}
+        # Consecutive signing failures per instance ID (circuit breaker)
+        self._failures: Dict[str, int] = {}
+        # Half-open instance IDs, held to a single slot until a probe succeeds
+        self._probing: Set[str] = set()
+        self._limiter = AIMDLimiter(
+            initial=min_instances,
+            maximum=max_instances * self.sign_pages * self.AIMD_MAX_FACTOR,
+            target_latency=self.AIMD_TARGET_LATENCY,
+        )
         self._lock = asyncio.Lock()
         self._started = False
 
@@ -72,6 +192,7 @@ class XYSSignManager:
             max_instances=max_instances,
             min_instances=min_instances,
             headless=headless,
+            lazy=lazy,
         )
 
     async def start(self, cookies: Optional[List[Dict[str, Any]]] = None) -> None:
@@ -87,20 +208,23 @@ class XYSSignManager:
 
             logger.info("xys_manager_starting")
 
-            # Create minimum number of instances
-            for i in range(self.min_instances):
-                try:
-                    instance = await self._create_instance(cookies)
-                    logger.info(
-                        "initial_instance_created",
-                        instance_id=instance.instance_id,
-                        index=i + 1,
-                    )
-                except Exception as e:
+            # Create minimum number of instances concurrently
+            results = await asyncio.gather(
+                *(self._create_instance(cookies) for _ in range(self.min_instances)),
+                return_exceptions=True,
+            )
+            for i, result in enumerate(results):
+                if isinstance(result, BaseException):
                     logger.error(
                         "initial_instance_failed",
                         index=i + 1,
-                        error=str(e),
+                        error=str(result),
+                    )
+                else:
+                    logger.info(
+                        "initial_instance_created",
+                        instance_id=result.instance_id,
+                        index=i + 1,
                     )
 
             self._started = True
@@ -123,7 +247,11 @@ class XYSSignManager:
             await asyncio.gather(*stop_tasks, return_exceptions=True)
 
             self._instances.clear()
-            self._instance_queue.clear()
+            self._rotation.clear()
+            self._ready = asyncio.Queue()
+            self._slots.clear()
+            self._failures.clear()
+            self._probing.clear()
             self._started = False
 
             logger.info("xys_manager_stopped")
@@ -146,12 +274,66 @@ class XYSSignManager:
         Raises:
             XYSSignServiceError: No available instances or generation failed
         """
-        instance = await self._get_available_instance()
+        return await self._run_signing(lambda instance: instance.sign(url, data))
 
-        if not instance:
-            raise BrowserNotReadyError("", "No available instances")
+    async def generate_xys_signatures(
+        self,
+        requests: List[Tuple[str, Optional[str]]],
+    ) -> List[Dict[str, Any]]:
+        """
+        Generate XYS signatures for several requests on one instance.
+
+        The whole batch is signed in a single page call.
+
+        Args:
+            requests: (url, data) pairs
+
+        Returns:
+            One signature result dict per request, in order
+
+        Raises:
+            XYSSignServiceError: No available instances or generation failed
+        """
+        return await self._run_signing(lambda instance: instance.sign_many(requests))
+
+    async def prepare_request(
+        self,
+        url: str,
+        data: Optional[str] = None,
+        want_cookies: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Generate XYS signature and optionally read cookies in one call.
+
+        Both come from the same instance, so the returned cookies match
+        the browser that produced the signature.
+
+        Args:
+            url: API URL path
+            data: Request body data
+            want_cookies: Include all browser cookies in the result
+
+        Returns:
+            Signature result dict, plus "all_cookies" when requested
 
-        return await instance.sign(url, data)
+        Raises:
+            XYSSignServiceError: No available instances or generation failed
+        """
+        async def sign_and_read(instance: XYSSignService) -> Dict[str, Any]:
+            result = await instance.sign(url, data)
+            if want_cookies:
+                result = {**result, "all_cookies": await instance.get_cookies()}
+            return result
+
+        return await self._run_signing(sign_and_read)
+
+    def has_ready_instance(self) -> bool:
+        """Check whether any instance can take a request (no lock, no await).
+
+        A READY instance counts even while its slots are borrowed: a signer
+        will wait on the ready queue for it.
+        """
+        return any(_can_sign(instance) for instance in self._instances.values())
 
     async def create_instance(
         self,
@@ -181,12 +363,14 @@ class XYSSignManager:
                 headless=headless if headless is not None else self.headless,
                 proxy=proxy or self.default_proxy,
                 browser_executable=self.browser_executable,
+                pages=self.sign_pages,
+                cookies=cookies,
+                lazy=self.lazy,
             )
 
-            await instance.start(cookies)
-
-            self._instances[instance.instance_id] = instance
-            self._instance_queue.append(instance.instance_id)
+            if not self.lazy:
+                await instance.start()
+            self._add_instance(instance)
 
             logger.info(
                 "instance_created",
@@ -220,9 +404,10 @@ class XYSSignManager:
             instance = self._instances.pop(instance_id)
             await instance.stop()
 
-            # Remove from queue
-            if instance_id in self._instance_queue:
-                self._instance_queue.remove(instance_id)
+            # Remove from rotation (a queued ready ID is discarded when taken)
+            self._rotation.pop(instance_id, None)
+            self._slots.pop(instance_id, None)
+            self._probing.discard(instance_id)
 
             logger.info(
                 "instance_stopped",
@@ -240,18 +425,23 @@ class XYSSignManager:
         instance_health = {}
         healthy_count = 0
 
-        for instance_id, instance in self._instances.items():
-            try:
-                health = await instance.health_check()
-                instance_health[instance_id] = health
-                if health.get("healthy"):
-                    healthy_count += 1
-            except Exception as e:
-                instance_health[instance_id] = {
+        # Check all instances concurrently (snapshot, the dict may change meanwhile)
+        instances = list(self._instances.items())
+        results = await asyncio.gather(
+            *(instance.health_check() for _, instance in instances),
+            return_exceptions=True,
+        )
+
+        for (instance_id, _), health in zip(instances, results):
+            if isinstance(health, BaseException):
+                health = {
                     "instance_id": instance_id,
                     "healthy": False,
-                    "error": str(e),
+                    "error": str(health),
                 }
+            elif health.get("healthy"):
+                healthy_count += 1
+            instance_health[instance_id] = health
 
         return {
             "manager_status": "running" if self._started else "stopped",
@@ -276,8 +466,10 @@ class XYSSignManager:
 
     def get_stats(self) -> Dict[str, Any]:
         """Get manager statistics."""
-        total_requests = sum(i.request_count for i in self._instances.values())
-        total_errors = sum(i.error_count for i in self._instances.values())
+        total_requests = total_errors = 0
+        for instance in self._instances.values():
+            total_requests += instance.request_count
+            total_errors += instance.error_count
 
         return {
             "status": "running" if self._started else "stopped",
@@ -308,40 +500,219 @@ class XYSSignManager:
         
         return await instance.get_cookies()
 
+    async def get_xsec_token(self, user_id: str) -> Optional[str]:
+        """
+        Get xsec_token for a user profile from an available instance.
+
+        Args:
+            user_id: XHS user ID
+
+        Returns:
+            xsec_token, or None if it could not be extracted
+
+        Raises:
+            BrowserNotReadyError: No available instances
+        """
+        instance = await self._get_available_instance()
+
+        if not instance:
+            raise BrowserNotReadyError("", "No available instances")
+
+        return await instance.get_xsec_token(user_id)
+
     async def _create_instance(
         self,
         cookies: Optional[List[Dict[str, Any]]] = None,
     ) -> XYSSignService:
-        """Create and start a new instance (internal)."""
+        """Create and start a new instance (internal; lazy ones start on first use)."""
         instance = XYSSignService(
             headless=self.headless,
             proxy=self.default_proxy,
             browser_executable=self.browser_executable,
+            pages=self.sign_pages,
+            cookies=cookies,
+            lazy=self.lazy,
         )
 
-        await instance.start(cookies)
+        if not self.lazy:
+            await instance.start()
+        self._add_instance(instance)
+
+        return instance
 
+    def _add_instance(self, instance: XYSSignService) -> None:
+        """Register an instance with one ready slot per signing page."""
         self._instances[instance.instance_id] = instance
-        self._instance_queue.append(instance.instance_id)
+        self._rotation[instance.instance_id] = None
+        self._slots[instance.instance_id] = 0
+        self._fill_slots(instance)
 
-        return instance
+    def _fill_slots(self, instance: XYSSignService) -> None:
+        """Queue slots for an instance up to one per signing page."""
+        instance_id = instance.instance_id
+        for _ in range(instance.page_count - self._slots[instance_id]):
+            self._ready.put_nowait(instance_id)
+        self._slots[instance_id] = instance.page_count
 
     async def _get_available_instance(self) -> Optional[XYSSignService]:
-        """Get an available instance using round-robin."""
-        async with self._lock:
-            if not self._instance_queue:
-                return None
+        """
+        Get an available instance using round-robin.
+
+        Used for shared lookups (cookies, xsec_token) that do not need
+        exclusive use. The scan never awaits, so it needs no lock.
+        """
+        # Round-robin selection: move the oldest ID to the back
+        for _ in range(len(self._rotation)):
+            instance_id = next(iter(self._rotation))
+            del self._rotation[instance_id]
+            self._rotation[instance_id] = None
+
+            instance = self._instances.get(instance_id)
+            if instance and instance.status == InstanceStatus.READY:
+                return instance
+
+        return None
+
+    async def _borrow_instance(self) -> XYSSignService:
+        """
+        Take a ready instance for exclusive use.
+
+        Waits up to sign_timeout for one to be returned. IDs of removed
+        instances, or of instances that can no longer sign, are dropped.
+        A lazy instance that has not started yet is handed out as is and
+        launches inside its first sign().
+
+        Raises:
+            BrowserNotReadyError: No instance became free in time
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.sign_timeout / 1000
 
-            # Round-robin selection
-            for _ in range(len(self._instance_queue)):
-                instance_id = self._instance_queue.popleft()
-                self._instance_queue.append(instance_id)
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise BrowserNotReadyError("", "No available instances")
 
-                instance = self._instances.get(instance_id)
-                if instance and instance.status == InstanceStatus.READY:
-                    return instance
+            try:
+                instance_id = await asyncio.wait_for(self._ready.get(), remaining)
+            except asyncio.TimeoutError:
+                raise BrowserNotReadyError("", "No available instances")
+
+            instance = self._instances.get(instance_id)
+            if instance is None:
+                continue
+
+            if not _can_sign(instance):
+                self._slots[instance_id] -= 1
+                logger.warning(
+                    "instance_left_ready_queue",
+                    instance_id=instance_id,
+                    status=instance.status.value,
+                )
+                continue
 
-            return None
+            return instance
+
+    async def _run_signing(
+        self,
+        work: Callable[[XYSSignService], Awaitable[Any]],
+    ) -> Any:
+        """Run work on a borrowed instance under the AIMD concurrency limit."""
+        loop = asyncio.get_running_loop()
+        await self._limiter.acquire()
+        started = loop.time()
+        success = False
+        try:
+            instance = await self._borrow_instance()
+            try:
+                result = await work(instance)
+                success = True
+                # A late success from before the circuit opened changes nothing
+                if (
+                    instance.status != InstanceStatus.UNHEALTHY
+                    and self._failures.pop(instance.instance_id, 0)
+                    >= self.CIRCUIT_FAILURE_THRESHOLD
+                ):
+                    # Half-open probe succeeded: restore the other page slots
+                    self._probing.discard(instance.instance_id)
+                    self._fill_slots(instance)
+                return result
+            except Exception:
+                self._record_failure(instance)
+                raise
+            finally:
+                self._return_instance(instance)
+        finally:
+            self._limiter.release(success, loop.time() - started)
+
+    def _return_instance(self, instance: XYSSignService) -> None:
+        """Put a borrowed instance back unless it was removed or tripped meanwhile.
+
+        A half-open instance keeps only one slot until its probe succeeds.
+        """
+        instance_id = instance.instance_id
+        if self._instances.get(instance_id) is not instance:
+            return
+        if instance.status == InstanceStatus.UNHEALTHY or (
+            instance_id in self._probing and self._slots[instance_id] > 1
+        ):
+            self._slots[instance_id] -= 1
+        else:
+            self._ready.put_nowait(instance_id)
+
+    def _record_failure(self, instance: XYSSignService) -> None:
+        """Count a signing failure; open the circuit at the threshold."""
+        instance_id = instance.instance_id
+        failures = self._failures.get(instance_id, 0) + 1
+        self._failures[instance_id] = failures
+
+        if (
+            failures >= self.CIRCUIT_FAILURE_THRESHOLD
+            and instance.status != InstanceStatus.UNHEALTHY
+        ):
+            instance.status = InstanceStatus.UNHEALTHY
+            self._probing.discard(instance_id)
+            asyncio.get_running_loop().call_later(
+                self.CIRCUIT_COOLDOWN, self._half_open, instance
+            )
+            logger.warning(
+                "instance_circuit_opened",
+                instance_id=instance_id,
+                consecutive_failures=failures,
+                cooldown=self.CIRCUIT_COOLDOWN,
+            )
+
+    def _half_open(self, instance: XYSSignService) -> None:
+        """
+        Let a tripped instance take one probe request after the cooldown.
+
+        The failure count is kept, so a failed probe reopens the circuit
+        immediately and a successful one clears it.
+        """
+        if (
+            self._instances.get(instance.instance_id) is not instance
+            or instance.status != InstanceStatus.UNHEALTHY
+        ):
+            return
+
+        instance_id = instance.instance_id
+        instance.status = InstanceStatus.READY
+        self._probing.add(instance_id)
+
+        # Drop slots still queued from before the trip (other IDs keep their order)
+        for _ in range(self._ready.qsize()):
+            queued_id = self._ready.get_nowait()
+            if queued_id == instance_id:
+                self._slots[instance_id] -= 1
+            else:
+                self._ready.put_nowait(queued_id)
+
+        # One probe slot, unless a borrow from before the trip is still out
+        # (its return then serves as the probe)
+        if not self._slots[instance_id]:
+            self._slots[instance_id] = 1
+            self._ready.put_nowait(instance_id)
+        logger.info("instance_circuit_half_open", instance_id=instance_id)
 
 
 # Global manager instance (singleton)
@@ -359,6 +730,9 @@ def get_xys_manager() -> XYSSignManager:
             headless=config.headless,
             default_proxy=config.proxy_config,
             browser_executable=config.default_browser_executable,
+            sign_timeout=config.sign_timeout,
+            sign_pages=config.sign_pages,
+            lazy=config.lazy_instances,
         )
     return _manager
 
@@ -369,6 +743,9 @@ async def init_xys_manager(
     headless: bool = True,
     cookies: Optional[List[Dict[str, Any]]] = None,
     browser_executable: Optional[str] = None,
+    sign_timeout: int = XYSSignManager.DEFAULT_SIGN_TIMEOUT,
+    sign_pages: int = XYSSignManager.DEFAULT_SIGN_PAGES,
+    lazy: bool = False,
 ) -> XYSSignManager:
     """Initialize and start the global XYS sign service manager."""
     global _manager
@@ -377,6 +754,9 @@ async def init_xys_manager(
         min_instances=min_instances,
         headless=headless,
         browser_executable=browser_executable,
+        sign_timeout=sign_timeout,
+        sign_pages=sign_pages,
+        lazy=lazy,
     )
     await _manager.start(cookies)
     return _manager
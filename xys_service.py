@@ -6,11 +6,20 @@ Uses browser automation to call window.mnsv2() function.
 """
 
 import asyncio
-import uuid
-from datetime import datetime
-from typing import Optional, Dict, Any, List
+import base64
+import hashlib
+import logging
+import re
+import secrets
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, List, Tuple
 from enum import Enum
+from urllib.parse import unquote
 
+import orjson
 import structlog
 
 logger = structlog.get_logger()
@@ -38,14 +47,16 @@ if BROWSER_TYPE:
     logger.info("browser_library_loaded", type=BROWSER_TYPE)
 
 from xys_scripts import (
-    STEALTH_SCRIPT,
-    PAGE_CHECK_SCRIPT,
-    XYS_INTERCEPTOR_SCRIPT,
-    CHECK_INTERCEPTOR_READY_SCRIPT,
-    CHECK_MNSV2_SCRIPT,
-    GET_XS_COMMON_SCRIPT,
+    XYS_BOOTSTRAP_SCRIPT,
+    PAGE_STATUS_SCRIPT,
+    SECURITY_COOKIES_READY_SCRIPT,
+    MNSV2_READY_SCRIPT,
+    MNSV2_HASH_PROBE_SCRIPT,
+    SIGN_READY_SCRIPT,
     GENERATE_XYS_SIGNATURE_SCRIPT,
-    CLEAR_SIGNATURE_STORE_SCRIPT,
+    GENERATE_XYS_SIGNATURE_BATCH_SCRIPT,
+    WAIT_XSEC_TOKEN_SCRIPT,
+    GET_XSEC_TOKEN_FROM_STATE_SCRIPT,
 )
 from exceptions import (
     XYSSignServiceError,
@@ -59,6 +70,102 @@ from config import get_config
 
 logger = structlog.get_logger()
 
+# xsec_token patterns, applied to the serialized profile page HTML.
+# The URL pattern is anchored on a query separator; ';' covers the '&amp;'
+# form that attribute values take in serialized HTML.
+_XSEC_URL_RE = re.compile(rb"[?&;]xsec_token=([A-Za-z0-9_=%-]+)")
+_XSEC_JSON_RE = re.compile(rb'"xsecToken":"([^"]+)"')
+
+# Static assets nothing here needs (mnsv2 and the security cookies come from
+# scripts and XHR). Matching by URL keeps scripts and XHR off the Python
+# route handler entirely.
+_BLOCKED_ASSET_RE = re.compile(
+    r"\.(?:png|jpe?g|gif|webp|avif|svg|ico|woff2?|ttf|otf|eot|css|mp4|webm|mp3)(?:[?#]|$)",
+    re.IGNORECASE,
+)
+
+
+# Cookie fields passed to Playwright only when the caller supplied them
+_OPTIONAL_COOKIE_FIELDS = frozenset({"expires", "httpOnly", "secure", "sameSite"})
+
+
+async def _abort_route(route) -> None:
+    await route.abort()
+
+
+# One Playwright driver process shared by every instance, started by the
+# first start() and stopped when the last instance stops
+_shared_playwright = None
+_shared_playwright_users = 0
+_shared_playwright_lock = asyncio.Lock()
+
+
+async def _acquire_playwright():
+    """Return the shared Playwright driver, starting it on first use."""
+    global _shared_playwright, _shared_playwright_users
+    async with _shared_playwright_lock:
+        if _shared_playwright is None:
+            _shared_playwright = await async_playwright().start()
+        _shared_playwright_users += 1
+        return _shared_playwright
+
+
+async def _release_playwright() -> None:
+    """Drop one user of the shared driver; stop it when none remain."""
+    global _shared_playwright, _shared_playwright_users
+    async with _shared_playwright_lock:
+        _shared_playwright_users -= 1
+        if _shared_playwright_users == 0 and _shared_playwright is not None:
+            playwright, _shared_playwright = _shared_playwright, None
+            await playwright.stop()
+
+# hashlib releases the GIL while hashing inputs of at least this many bytes,
+# so only those are worth handing to worker threads
+_MD5_GIL_RELEASE_SIZE = 2048
+
+
+def _md5_hex(payload: bytes) -> str:
+    return hashlib.md5(payload).hexdigest()
+
+
+# X-s uses standard Base64 with a shuffled alphabet ('=' padding unchanged)
+_XYS_B64_TABLE = bytes.maketrans(
+    b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/",
+    b"ZmserbBoHQtNP+wOcza/LpngG8yJq42KWYj0DSfdikx3VT16IlUAFM97hECvuRX5",
+)
+
+
+_XYS_JSON_SUFFIX = (b',"x4":""}', b',"x4":"string"}')
+
+
+@lru_cache(maxsize=8)
+def _xys_json_prefix(platform: str) -> bytes:
+    """Serialized sign object up to x3; only platform varies, per browser."""
+    return b'{"x0":"4.2.8","x1":"ugc","x2":' + orjson.dumps(platform) + b',"x3":'
+
+
+def build_xys_signature(mns_result: Any, platform: Any, data: Optional[str]) -> str:
+    """Build the X-s header value from the page's mnsv2 result.
+
+    Byte-for-byte equal to the in-page reference: compact JSON with
+    fields x0..x4 in order, UTF-8 encoded, then custom-alphabet Base64.
+    """
+    if isinstance(platform, str):
+        sign_json = (
+            _xys_json_prefix(platform)
+            + orjson.dumps(mns_result)
+            + _XYS_JSON_SUFFIX[bool(data)]
+        )
+    else:
+        sign_json = orjson.dumps({
+            "x0": "4.2.8",
+            "x1": "ugc",
+            "x2": platform,
+            "x3": mns_result,
+            "x4": "string" if data else "",
+        })
+    return "XYS_" + base64.b64encode(sign_json).translate(_XYS_B64_TABLE).decode("ascii")
+
 
 class InstanceStatus(str, Enum):
     """Browser instance status"""
@@ -66,6 +173,7 @@ class InstanceStatus(str, Enum):
     READY = "ready"
     BUSY = "busy"
     ERROR = "error"
+    UNHEALTHY = "unhealthy"
     STOPPED = "stopped"
 
 
@@ -84,12 +192,46 @@ class XYSSignService:
     # XHS Creator URL for initialization
     CREATOR_URL = "https://creator.xiaohongshu.com"
 
+    # XHS user profile URL for xsec_token lookups
+    PROFILE_URL = "https://www.xiaohongshu.com/user/profile"
+
     # Page load timeout
     PAGE_TIMEOUT = 30000  # 30 seconds
 
-    # Sign function check retry settings
-    SIGN_CHECK_RETRIES = 5
-    SIGN_CHECK_DELAY = 2  # seconds
+    # xsec_token lookup timeouts
+    PROFILE_TIMEOUT = 20000  # 20 seconds
+    XSEC_RENDER_TIMEOUT = 2000  # 2 seconds
+
+    # Readiness waits after navigation (polled in the page, return as soon
+    # as the condition holds)
+    SECURITY_COOKIE_TIMEOUT = 5000  # 5 seconds, the former fixed wait
+    MNSV2_TIMEOUT = 10000  # 10 seconds
+
+    # Local mirror of the context cookie jar. Dropped whenever a response
+    # sets cookies; the TTL bounds staleness from cookies written by page JS
+    COOKIE_CACHE_TTL = 5  # seconds
+
+    # Memoized signatures for repeated (url, data) pairs, returned unchanged
+    # (X-s and X-t stay a matching pair). The TTL matches xhs_client.SIGN_CACHE_TTL
+    SIGN_CACHE_SIZE = 1024
+    SIGN_CACHE_TTL = 60  # seconds
+
+    # A healthy page probe is reused for this long, so frequent liveness
+    # checks don't compete with signing for the page
+    HEALTH_CACHE_TTL = 0.5  # seconds
+
+    __slots__ = (
+        "instance_id", "headless", "proxy", "browser_executable", "page_count", "lazy",
+        "_start_cookies",
+        "status", "browser", "context", "page", "_playwright",
+        "_sign_pages", "_free_pages", "_xsec_page", "_xsec_lock",
+        "_xs_common", "_cookie_cache", "_cookie_cache_expires",
+        "_formatted_cookies", "_formatted_cookies_source",
+        "_mnsv2_needs_hash", "_sign_cache", "_healthy_until",
+        "created_at", "_created_ns", "_last_used_ns",
+        "request_count", "error_count", "consecutive_errors",
+        "_debug_enabled", "_lock",
+    )
 
     def __init__(
         self,
@@ -97,6 +239,9 @@ class XYSSignService:
         headless: bool = True,
         proxy: Optional[Dict[str, str]] = None,
         browser_executable: Optional[str] = None,
+        pages: int = 1,
+        cookies: Optional[List[Dict[str, Any]]] = None,
+        lazy: bool = False,
     ):
         """
         Initialize XYS sign service instance.
@@ -106,11 +251,18 @@ class XYSSignService:
             headless: Run browser in headless mode
             proxy: Proxy configuration (server, username, password)
             browser_executable: Path to browser executable
+            pages: Number of Creator pages that sign concurrently
+            cookies: Cookies to inject when started without explicit ones
+            lazy: Start the browser on first sign() instead of up front;
+                stop() turns this off
         """
-        self.instance_id = instance_id or str(uuid.uuid4())[:8]
+        self.instance_id = instance_id or secrets.token_hex(4)
         self.headless = headless
         self.proxy = proxy
         self.browser_executable = browser_executable
+        self.page_count = max(1, pages)
+        self.lazy = lazy
+        self._start_cookies = cookies
 
         self.status = InstanceStatus.STOPPED
         self.browser: Optional[Browser] = None
@@ -118,17 +270,52 @@ class XYSSignService:
         self.page: Optional[Page] = None
         self._playwright = None
 
+        # Signing pages (self.page plus extra pre-warmed ones); a signer
+        # takes one from the queue and puts it back. A None entry means the
+        # browser was closed and wakes waiters so they fail fast
+        self._sign_pages: List[Page] = []
+        self._free_pages: asyncio.Queue = asyncio.Queue()
+
+        # Dedicated page for xsec_token lookups (keeps self.page on Creator)
+        self._xsec_page: Optional[Page] = None
+        self._xsec_lock = asyncio.Lock()
+
         # X-S-Common cache
         self._xs_common: str = ""
 
+        # Cookie jar mirror (name -> value) and its expiry on the monotonic clock
+        self._cookie_cache: Optional[Dict[str, str]] = None
+        self._cookie_cache_expires: float = 0.0
+
+        # Playwright-ready form of the last injected cookie list, reused when
+        # the same list is injected again (e.g. on restart)
+        self._formatted_cookies: Optional[List[Dict[str, Any]]] = None
+        self._formatted_cookies_source: Optional[List[Dict[str, Any]]] = None
+
+        # Whether mnsv2 reads its hash argument (probed once mnsv2 is loaded)
+        self._mnsv2_needs_hash: bool = True
+
+        # (url, data) -> (X-s, X-t, X-s-common, expiry on the monotonic clock), LRU order
+        self._sign_cache: "OrderedDict[Tuple[str, str], Tuple[str, str, str, float]]" = OrderedDict()
+
+        # Monotonic deadline until which the last healthy page probe is reused
+        self._healthy_until: float = 0.0
+
         # Statistics
         self.created_at = datetime.utcnow()
-        self.last_used_at: Optional[datetime] = None
+        # Last use is a raw monotonic stamp, converted to wall-clock time
+        # (relative to created_at) only when stats are reported
+        self._created_ns = time.monotonic_ns()
+        self._last_used_ns = 0
         self.request_count = 0
         self.error_count = 0
         self.consecutive_errors = 0
 
-        # Lock for thread safety
+        # Debug events sit on the signing hot path; the level check is done
+        # once here so their keyword arguments aren't built when filtered out
+        self._debug_enabled = logger.is_enabled_for(logging.DEBUG)
+
+        # Lock for lifecycle transitions (start/stop)
         self._lock = asyncio.Lock()
 
         logger.info(
@@ -143,7 +330,8 @@ class XYSSignService:
         Start browser instance.
 
         Args:
-            cookies: Optional cookies to inject
+            cookies: Optional cookies to inject (default: the ones given to
+                __init__ or the previous start())
         """
         if not BROWSER_AVAILABLE:
             raise XYSSignServiceError(
@@ -154,125 +342,153 @@ class XYSSignService:
             if self.status == InstanceStatus.READY:
                 return
 
-            self.status = InstanceStatus.STARTING
+            if cookies is not None:
+                self._start_cookies = cookies
+            await self._launch(self._start_cookies)
 
-            try:
-                # Launch playwright
-                self._playwright = await async_playwright().start()
-
-                # Browser launch options - 使用系统 Chrome（与现有工作代码保持一致）
-                launch_options = {
-                    "headless": self.headless,
-                    "channel": "chrome",  # 使用系统安装的 Chrome
-                    "args": [
-                        "--disable-blink-features=AutomationControlled",
-                        "--disable-web-security",
-                        "--no-sandbox",
-                        "--disable-dev-shm-usage",
-                        "--disable-background-timer-throttling",
-                        "--disable-backgrounding-occluded-windows",
-                        "--disable-renderer-backgrounding",
-                    ]
-                }
+    async def _launch(self, cookies: Optional[List[Dict[str, Any]]]) -> None:
+        """Launch browser, context and signing pages (caller holds _lock)."""
+        self.status = InstanceStatus.STARTING
 
-                # Add custom executable if provided (覆盖 channel 设置)
-                if self.browser_executable:
-                    launch_options.pop("channel", None)
-                    launch_options["executable_path"] = self.browser_executable
-
-                # Launch browser
-                self.browser = await self._playwright.chromium.launch(**launch_options)
-
-                # Context options
-                context_options = {
-                    "viewport": {"width": 1920, "height": 1080},
-                    "user_agent": (
-                        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                        "AppleWebKit/537.36 (KHTML, like Gecko) "
-                        "Chrome/120.0.0.0 Safari/537.36"
-                    ),
-                    "locale": "zh-CN",
-                    "timezone_id": "Asia/Shanghai",
-                }
-
-                # Add proxy if configured
-                if self.proxy:
-                    context_options["proxy"] = self.proxy
-
-                # Create context
-                self.context = await self.browser.new_context(**context_options)
-
-                # Add stealth script
-                await self.context.add_init_script(STEALTH_SCRIPT)
-
-                # Add XYS interceptor script (captures signatures from real requests)
-                await self.context.add_init_script(XYS_INTERCEPTOR_SCRIPT)
-
-                # Inject cookies if provided
-                if cookies:
-                    await self._inject_cookies(cookies)
-
-                # Create page
-                self.page = await self.context.new_page()
-
-                # Navigate to Creator platform
-                await self._navigate_to_creator()
+        try:
+            # Attach to the shared playwright driver
+            self._playwright = await _acquire_playwright()
+
+            # Browser launch options - 使用系统 Chrome（与现有工作代码保持一致）
+            launch_options = {
+                "headless": self.headless,
+                "channel": "chrome",  # 使用系统安装的 Chrome
+                "args": [
+                    "--disable-blink-features=AutomationControlled",
+                    "--disable-web-security",
+                    "--no-sandbox",
+                    "--disable-dev-shm-usage",
+                    "--disable-background-timer-throttling",
+                    "--disable-backgrounding-occluded-windows",
+                    "--disable-renderer-backgrounding",
+                ]
+            }
+
+            # Add custom executable if provided (覆盖 channel 设置)
+            if self.browser_executable:
+                launch_options.pop("channel", None)
+                launch_options["executable_path"] = self.browser_executable
+
+            # Launch browser
+            self.browser = await self._playwright.chromium.launch(**launch_options)
+
+            # Context options
+            context_options = {
+                "viewport": {"width": 1920, "height": 1080},
+                "user_agent": (
+                    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                    "AppleWebKit/537.36 (KHTML, like Gecko) "
+                    "Chrome/120.0.0.0 Safari/537.36"
+                ),
+                "locale": "zh-CN",
+                "timezone_id": "Asia/Shanghai",
+            }
+
+            # Add proxy if configured
+            if self.proxy:
+                context_options["proxy"] = self.proxy
+
+            # Create context
+            self.context = await self.browser.new_context(**context_options)
+
+            # Skip images, fonts, stylesheets and media on every page
+            await self.context.route(_BLOCKED_ASSET_RE, _abort_route)
+
+            # Any Set-Cookie response invalidates the cookie mirror
+            self.context.on("response", self._on_response)
+
+            # Stealth + X-S-Common interceptor + window.__xysSign installer,
+            # registered as one init script (signing calls only send a stub)
+            await self.context.add_init_script(XYS_BOOTSTRAP_SCRIPT)
+
+            # Inject cookies if provided
+            if cookies:
+                await self._inject_cookies(cookies)
+
+            # Create page
+            self.page = await self.context.new_page()
+
+            # Navigate to Creator platform
+            await self._navigate_to_creator()
 
-                # Wait for mnsv2 to be available
-                await self._wait_for_mnsv2()
+            # Wait for mnsv2, probe its hash use and capture X-S-Common
+            await self._wait_for_sign_ready()
 
-                # Capture X-S-Common
-                await self._capture_xs_common()
+            # Pre-warm the extra signing pages in parallel
+            extra_pages = await asyncio.gather(
+                *(self._open_sign_page() for _ in range(self.page_count - 1))
+            )
+            self._sign_pages = [self.page, *extra_pages]
+            self._drain_free_pages()
+            for page in self._sign_pages:
+                self._free_pages.put_nowait(page)
 
-                self.status = InstanceStatus.READY
+            self.status = InstanceStatus.READY
 
-                logger.info(
-                    "xys_service_started",
-                    instance_id=self.instance_id,
-                    has_xs_common=bool(self._xs_common),
-                )
+            logger.info(
+                "xys_service_started",
+                instance_id=self.instance_id,
+                has_xs_common=bool(self._xs_common),
+            )
 
-            except Exception as e:
-                self.status = InstanceStatus.ERROR
-                logger.error(
-                    "xys_service_start_failed",
-                    instance_id=self.instance_id,
-                    error=str(e),
-                )
-                await self.stop()
-                raise XYSSignServiceError(f"Failed to start browser: {e}")
+        except Exception as e:
+            self.status = InstanceStatus.ERROR
+            logger.error(
+                "xys_service_start_failed",
+                instance_id=self.instance_id,
+                error=str(e),
+            )
+            # Already holding _lock, so clean up directly rather than via stop()
+            await self._close()
+            raise XYSSignServiceError(f"Failed to start browser: {e}")
 
     async def stop(self) -> None:
-        """Stop browser instance and cleanup resources."""
+        """Stop browser instance and cleanup resources (no lazy restart after)."""
+        self.lazy = False
         async with self._lock:
             self.status = InstanceStatus.STOPPED
-
-            try:
-                if self.page:
-                    await self.page.close()
-                if self.context:
-                    await self.context.close()
-                if self.browser:
-                    await self.browser.close()
-                if self._playwright:
-                    await self._playwright.stop()
-            except Exception as e:
-                logger.warning(
-                    "xys_service_stop_error",
-                    instance_id=self.instance_id,
-                    error=str(e),
-                )
-            finally:
-                self.page = None
-                self.context = None
-                self.browser = None
-                self._playwright = None
+            await self._close()
 
             logger.info(
                 "xys_service_stopped",
                 instance_id=self.instance_id,
             )
 
+    async def _close(self) -> None:
+        """Close page, context and browser and detach from the driver (caller holds _lock)."""
+        try:
+            # Closing the browser closes its context and every page in one
+            # round-trip; close the context directly only if there is no browser
+            if self.browser:
+                await self.browser.close()
+            elif self.context:
+                await self.context.close()
+        except Exception as e:
+            logger.warning(
+                "xys_service_stop_error",
+                instance_id=self.instance_id,
+                error=str(e),
+            )
+        finally:
+            self.page = None
+            self._sign_pages = []
+            self._drain_free_pages()
+            self._free_pages.put_nowait(None)
+            self._xsec_page = None
+            self.context = None
+            self.browser = None
+            self._sign_cache.clear()
+            self._healthy_until = 0.0
+            self._cookie_cache = None
+            if self._playwright:
+                self._playwright = None
+                await _release_playwright()
+
     async def sign(
         self,
         url: str,
@@ -292,67 +508,281 @@ class XYSSignService:
             BrowserNotReadyError: Browser is not ready
             SignatureGenerationError: Failed to generate signature
         """
+        if self.lazy and self.status == InstanceStatus.STOPPED:
+            await self._lazy_start()
+
         if self.status != InstanceStatus.READY:
             raise BrowserNotReadyError(
                 self.instance_id,
                 f"Browser status is {self.status.value}"
             )
 
-        async with self._lock:
-            self.status = InstanceStatus.BUSY
-
-            try:
-                if not self.page:
-                    raise BrowserNotReadyError(self.instance_id, "Page is None")
+        cache_key = (url, data or "")
+        cached = self._sign_cache.get(cache_key)
+        if cached is not None:
+            if cached[3] > time.monotonic():
+                self._sign_cache.move_to_end(cache_key)
+                self.request_count += 1
+                self._last_used_ns = time.monotonic_ns()
+                return {
+                    "success": True,
+                    "X-s": cached[0],
+                    "X-t": cached[1],
+                    "X-s-common": cached[2],
+                }
+            del self._sign_cache[cache_key]
 
-                # Generate signature using interceptor
-                result = await self.page.evaluate(
-                    GENERATE_XYS_SIGNATURE_SCRIPT,
-                    [url, data or ""]
-                )
+        page = await self._acquire_page()
+        try:
+            # Generate signature using interceptor
+            result = await page.evaluate(
+                GENERATE_XYS_SIGNATURE_SCRIPT,
+                self._sign_args(url, data)
+            )
 
-                if not result.get("success"):
-                    raise SignatureGenerationError(result.get("error", "Unknown error"))
+            if not result.get("success"):
+                raise SignatureGenerationError(result.get("error", "Unknown error"))
 
-                # Use cached X-S-Common if not in result
-                if not result.get("X-s-common") and self._xs_common:
-                    result["X-s-common"] = self._xs_common
+            # Use cached X-S-Common if not in result
+            if not result.get("X-s-common") and self._xs_common:
+                result["X-s-common"] = self._xs_common
 
-                self.request_count += 1
-                self.last_used_at = datetime.utcnow()
-                self.consecutive_errors = 0
-                self.status = InstanceStatus.READY
+            self.request_count += 1
+            self._last_used_ns = time.monotonic_ns()
+            self.consecutive_errors = 0
 
+            if self._debug_enabled:
                 logger.debug(
                     "xys_signature_generated",
                     instance_id=self.instance_id,
                     url=url,
                 )
 
-                return {
-                    "success": True,
-                    "X-s": result.get("X-s", ""),
-                    "X-t": result.get("X-t", ""),
-                    "X-s-common": result.get("X-s-common", ""),
-                }
+            signature = {
+                "success": True,
+                "X-s": build_xys_signature(result["mns"], result["platform"], data),
+                "X-t": result.get("X-t", ""),
+                "X-s-common": result.get("X-s-common", ""),
+            }
+            self._sign_cache[cache_key] = (
+                signature["X-s"],
+                signature["X-t"],
+                signature["X-s-common"],
+                time.monotonic() + self.SIGN_CACHE_TTL,
+            )
+            if len(self._sign_cache) > self.SIGN_CACHE_SIZE:
+                self._sign_cache.popitem(last=False)
+            return signature
 
-            except Exception as e:
-                self.error_count += 1
-                self.consecutive_errors += 1
-                self.status = InstanceStatus.READY
+        except Exception as e:
+            self.error_count += 1
+            self.consecutive_errors += 1
+
+            logger.error(
+                "xys_signature_generation_failed",
+                instance_id=self.instance_id,
+                url=url,
+                error=str(e),
+            )
+
+            # Try to recover if too many consecutive errors
+            if self.consecutive_errors >= 3:
+                await self._try_recover(page)
 
-                logger.error(
-                    "xys_signature_generation_failed",
+            raise SignatureGenerationError(str(e))
+        finally:
+            self._release_page(page)
+
+    async def sign_many(
+        self,
+        requests: List[Tuple[str, Optional[str]]],
+    ) -> List[Dict[str, Any]]:
+        """
+        Generate XYS signatures for several API requests in one page call.
+
+        Args:
+            requests: (url, data) pairs
+
+        Returns:
+            One result dict per request, in order. Failed items carry
+            success=False and an error message instead of the headers.
+
+        Raises:
+            BrowserNotReadyError: Browser is not ready
+            SignatureGenerationError: The batch call itself failed
+        """
+        if self.lazy and self.status == InstanceStatus.STOPPED:
+            await self._lazy_start()
+
+        if self.status != InstanceStatus.READY:
+            raise BrowserNotReadyError(
+                self.instance_id,
+                f"Browser status is {self.status.value}"
+            )
+
+        # Hash before taking a page
+        batch_args = await self._sign_args_many(requests)
+
+        page = await self._acquire_page()
+        try:
+            results = await page.evaluate(
+                GENERATE_XYS_SIGNATURE_BATCH_SCRIPT,
+                batch_args
+            )
+            if len(results) != len(requests):
+                raise SignatureGenerationError(
+                    f"Batch returned {len(results)} results for {len(requests)} requests"
+                )
+
+            signed = []
+            failed = 0
+            for (_, data), result in zip(requests, results):
+                if result.get("success"):
+                    signed.append({
+                        "success": True,
+                        "X-s": build_xys_signature(result["mns"], result["platform"], data),
+                        "X-t": result.get("X-t", ""),
+                        "X-s-common": result.get("X-s-common") or self._xs_common,
+                    })
+                else:
+                    failed += 1
+                    signed.append({
+                        "success": False,
+                        "error": result.get("error", "Unknown error"),
+                    })
+
+            self.request_count += len(signed)
+            self.error_count += failed
+            self._last_used_ns = time.monotonic_ns()
+            self.consecutive_errors = 0
+
+            if self._debug_enabled:
+                logger.debug(
+                    "xys_signature_batch_generated",
                     instance_id=self.instance_id,
-                    url=url,
-                    error=str(e),
+                    count=len(signed),
+                    failed=failed,
+                )
+
+            return signed
+
+        except Exception as e:
+            self.error_count += len(requests)
+            self.consecutive_errors += 1
+
+            logger.error(
+                "xys_signature_batch_failed",
+                instance_id=self.instance_id,
+                count=len(requests),
+                error=str(e),
+            )
+
+            if self.consecutive_errors >= 3:
+                await self._try_recover(page)
+
+            raise SignatureGenerationError(str(e))
+        finally:
+            self._release_page(page)
+
+    async def _lazy_start(self) -> None:
+        """Start a lazy instance on first use.
+
+        Re-checked under the lock, so concurrent first callers launch once
+        and a stop() that got there first is not undone.
+        """
+        if not BROWSER_AVAILABLE:
+            raise BrowserNotReadyError(self.instance_id, "Browser library not installed")
+
+        async with self._lock:
+            if not self.lazy or self.status != InstanceStatus.STOPPED:
+                return
+
+            logger.info("xys_service_lazy_start", instance_id=self.instance_id)
+            try:
+                await self._launch(self._start_cookies)
+            except XYSSignServiceError as e:
+                raise BrowserNotReadyError(self.instance_id, str(e)) from e
+
+    async def _acquire_page(self) -> Page:
+        """Take a free signing page, waiting up to PAGE_TIMEOUT for one.
+
+        Raises:
+            BrowserNotReadyError: No page became free in time
+        """
+        try:
+            page = await asyncio.wait_for(
+                self._free_pages.get(), self.PAGE_TIMEOUT / 1000
+            )
+        except asyncio.TimeoutError:
+            raise BrowserNotReadyError(self.instance_id, "No free signing page")
+
+        if page is None:
+            # Browser closed while waiting; pass the wake-up on to the next waiter
+            self._free_pages.put_nowait(None)
+            raise BrowserNotReadyError(self.instance_id, "Browser was stopped")
+        return page
+
+    def _drain_free_pages(self) -> None:
+        """Empty the free-page queue in place (waiters keep their reference)."""
+        while not self._free_pages.empty():
+            self._free_pages.get_nowait()
+
+    def _release_page(self, page: Page) -> None:
+        """Return a signing page unless it was closed by stop() meanwhile."""
+        if page in self._sign_pages:
+            self._free_pages.put_nowait(page)
+
+    async def _open_sign_page(self) -> Page:
+        """Open an extra Creator page and wait until it can sign."""
+        page = await self.context.new_page()
+        await self._navigate_to_creator(page)
+        await self._wait_for_mnsv2(page)
+        return page
+
+    def _sign_args(self, url: str, data: Optional[str]) -> List[str]:
+        """Build the [url, data, md5] argument list for window.__xysSign.
+
+        The MD5 of the payload is computed natively and passed in, and
+        skipped entirely when mnsv2 ignores it.
+        """
+        data = data or ""
+        if not self._mnsv2_needs_hash:
+            return [url, data, ""]
+        return [url, data, _md5_hex((url + data).encode("utf-8"))]
+
+    async def _sign_args_many(
+        self,
+        requests: List[Tuple[str, Optional[str]]],
+    ) -> List[List[str]]:
+        """Build __xysSign argument lists for a batch.
+
+        Payloads large enough for hashlib to release the GIL are hashed
+        in parallel on the default executor; small ones stay inline,
+        where a thread hop would cost more than the hash.
+        """
+        if not self._mnsv2_needs_hash:
+            return [[url, data or "", ""] for url, data in requests]
+
+        loop = asyncio.get_running_loop()
+        batch_args: List[List[str]] = []
+        pending = []
+        for url, data in requests:
+            data = data or ""
+            payload = (url + data).encode("utf-8")
+            if len(payload) >= _MD5_GIL_RELEASE_SIZE:
+                pending.append(
+                    (len(batch_args), loop.run_in_executor(None, _md5_hex, payload))
                 )
+                batch_args.append([url, data, ""])
+            else:
+                batch_args.append([url, data, _md5_hex(payload)])
 
-                # Try to recover if too many consecutive errors
-                if self.consecutive_errors >= 3:
-                    await self._try_recover()
+        if pending:
+            hashes = await asyncio.gather(*(future for _, future in pending))
+            for (index, _), payload_hash in zip(pending, hashes):
+                batch_args[index][2] = payload_hash
 
-                raise SignatureGenerationError(str(e))
+        return batch_args
 
     async def health_check(self) -> Dict[str, Any]:
         """
@@ -366,72 +796,151 @@ class XYSSignService:
             "status": self.status.value,
             "healthy": False,
             "created_at": self.created_at.isoformat(),
-            "last_used_at": self.last_used_at.isoformat() if self.last_used_at else None,
+            "last_used_at": self._last_used_iso(),
             "request_count": self.request_count,
             "error_count": self.error_count,
             "consecutive_errors": self.consecutive_errors,
             "has_xs_common": bool(self._xs_common),
         }
 
+        if self.lazy and self.status == InstanceStatus.STOPPED:
+            # Not launched yet; the first signing request starts it
+            result["healthy"] = True
+            return result
+
         if self.status != InstanceStatus.READY:
             result["error"] = f"Instance status is {self.status.value}"
             return result
 
+        if time.monotonic() < self._healthy_until:
+            result["healthy"] = True
+            result["mnsv2_available"] = True
+            return result
+
         try:
             if not self.page:
                 result["error"] = "Page is None"
                 return result
 
-            # Check interceptor availability
-            interceptor_ready = await self.page.evaluate(CHECK_INTERCEPTOR_READY_SCRIPT)
+            # Interceptor, mnsv2 and page body in one round-trip
+            page_status = await self.page.evaluate(PAGE_STATUS_SCRIPT)
 
-            if not interceptor_ready:
+            if not page_status["interceptorReady"]:
                 result["error"] = "XYS interceptor not ready"
                 return result
 
-            # Check mnsv2 availability
-            mnsv2_available = await self.page.evaluate(CHECK_MNSV2_SCRIPT)
-
-            if not mnsv2_available:
+            if not page_status["hasMnsv2"]:
                 result["error"] = "mnsv2 function not available"
                 return result
 
-            # Check page status
-            page_status = await self.page.evaluate(PAGE_CHECK_SCRIPT)
-
-            if not page_status.get("success"):
-                result["error"] = page_status.get("error", "Unknown page error")
+            if not page_status["hasBody"]:
+                result["error"] = "No body element"
                 return result
 
             result["healthy"] = True
-            result["mnsv2_available"] = mnsv2_available
+            result["mnsv2_available"] = True
+            self._healthy_until = time.monotonic() + self.HEALTH_CACHE_TTL
 
         except Exception as e:
             result["error"] = str(e)
 
         return result
 
-    async def _navigate_to_creator(self) -> None:
-        """Navigate to XHS Creator platform and wait for load."""
-        if not self.page:
+    async def get_xsec_token(self, user_id: str) -> Optional[str]:
+        """
+        Get xsec_token for a user profile page.
+
+        Uses a dedicated page in the same context, so the signing page
+        never leaves the Creator platform and needs no re-navigation.
+
+        Args:
+            user_id: XHS user ID
+
+        Returns:
+            xsec_token, or None if it could not be extracted
+
+        Raises:
+            BrowserNotReadyError: Browser is not ready
+        """
+        if self.status != InstanceStatus.READY or not self.context:
+            raise BrowserNotReadyError(
+                self.instance_id,
+                f"Browser status is {self.status.value}"
+            )
+
+        async with self._xsec_lock:
+            if self._xsec_page is None or self._xsec_page.is_closed():
+                self._xsec_page = await self.context.new_page()
+
+            page = self._xsec_page
+
+            # Navigate to user profile
+            await page.goto(
+                f"{self.PROFILE_URL}/{user_id}",
+                wait_until="domcontentloaded",
+                timeout=self.PROFILE_TIMEOUT,
+            )
+
+            # Wait for Vue to render the token (returns as soon as it appears)
+            try:
+                await page.wait_for_function(
+                    WAIT_XSEC_TOKEN_SCRIPT,
+                    timeout=self.XSEC_RENDER_TIMEOUT,
+                )
+            except Exception:
+                pass
+
+            # Extract xsec_token from page HTML (URL params, then JSON)
+            html = (await page.content()).encode("utf-8", "ignore")
+
+            match = _XSEC_URL_RE.search(html)
+            if match:
+                token = match.group(1).decode()
+                return unquote(token) if "%" in token else token
+
+            match = _XSEC_JSON_RE.search(html)
+            if match:
+                return match.group(1).decode()
+
+            # Fall back to __INITIAL_STATE__
+            return await page.evaluate(GET_XSEC_TOKEN_FROM_STATE_SCRIPT)
+
+    async def _navigate_to_creator(self, page: Optional[Page] = None) -> None:
+        """Navigate to XHS Creator platform and wait for load.
+
+        Args:
+            page: Page to navigate (defaults to the primary page)
+        """
+        page = page or self.page
+        if not page:
             raise PageLoadError("Page is None")
 
         try:
             # First visit the login page to get security cookies
             login_url = f"{self.CREATOR_URL}/login"
-            await self.page.goto(
+            await page.goto(
                 login_url,
                 wait_until="domcontentloaded",  # 不要用 networkidle，容易超时
                 timeout=self.PAGE_TIMEOUT,
             )
 
-            # Wait for page to stabilize and JS to execute (security cookies need time)
-            await asyncio.sleep(5)
+            # Wait for page JS to set the security cookies
+            try:
+                await page.wait_for_function(
+                    SECURITY_COOKIES_READY_SCRIPT,
+                    timeout=self.SECURITY_COOKIE_TIMEOUT,
+                )
+            except Exception as e:
+                logger.warning(
+                    "security_cookies_wait_timeout",
+                    instance_id=self.instance_id,
+                    error=str(e),
+                )
 
             # Check for errors
-            page_status = await self.page.evaluate(PAGE_CHECK_SCRIPT)
+            page_status = await page.evaluate(PAGE_STATUS_SCRIPT)
 
-            if not page_status.get("success"):
+            if not page_status["hasBody"]:
                 logger.warning(
                     "page_status_warning",
                     instance_id=self.instance_id,
@@ -440,7 +949,9 @@ class XYSSignService:
             
             # Log cookies obtained
             cookies = await self.context.cookies() if self.context else []
-            cookie_names = [c["name"] for c in cookies]
+            self._cookie_cache = {c["name"]: c["value"] for c in cookies}
+            self._cookie_cache_expires = time.monotonic() + self.COOKIE_CACHE_TTL
+            cookie_names = list(self._cookie_cache)
             logger.info(
                 "cookies_obtained_after_navigation",
                 instance_id=self.instance_id,
@@ -451,75 +962,127 @@ class XYSSignService:
         except Exception as e:
             raise PageLoadError(f"Failed to navigate to Creator: {e}")
 
-    async def _wait_for_mnsv2(self) -> None:
-        """Wait for mnsv2 function to be available."""
+    async def _wait_for_mnsv2(self, page: Optional[Page] = None) -> bool:
+        """Wait for mnsv2 function to be available on page (default: primary).
+
+        Returns:
+            Whether mnsv2 appeared before the timeout
+        """
+        page = page or self.page
+        if not page:
+            raise BrowserNotReadyError(self.instance_id, "Page is None")
+
+        try:
+            await page.wait_for_function(
+                MNSV2_READY_SCRIPT,
+                timeout=self.MNSV2_TIMEOUT,
+            )
+            if self._debug_enabled:
+                logger.debug("mnsv2_available", instance_id=self.instance_id)
+            return True
+        except Exception as e:
+            # Log warning but don't fail - mnsv2 might still work
+            logger.warning(
+                "mnsv2_not_detected",
+                instance_id=self.instance_id,
+                message="mnsv2 not detected before timeout, continuing anyway",
+                error=str(e),
+            )
+            return False
+
+    async def _wait_for_sign_ready(self) -> None:
+        """
+        Wait for mnsv2 on the primary page during startup.
+
+        The same poll returns the hash probe result and X-S-Common, so no
+        separate probe and capture round-trips follow. Falls back to them
+        if mnsv2 does not show up in time.
+        """
         if not self.page:
             raise BrowserNotReadyError(self.instance_id, "Page is None")
 
-        for attempt in range(self.SIGN_CHECK_RETRIES):
-            try:
-                mnsv2_available = await self.page.evaluate(CHECK_MNSV2_SCRIPT)
-
-                if mnsv2_available:
-                    logger.debug(
-                        "mnsv2_available",
-                        instance_id=self.instance_id,
-                        attempt=attempt + 1,
-                    )
-                    return
-
-                # Also check if interceptor is ready
-                interceptor_ready = await self.page.evaluate(CHECK_INTERCEPTOR_READY_SCRIPT)
-
-                if interceptor_ready:
-                    logger.debug(
-                        "xys_sign_ready",
-                        instance_id=self.instance_id,
-                        attempt=attempt + 1,
-                    )
-                    return
-
-                # Wait and retry
-                await asyncio.sleep(self.SIGN_CHECK_DELAY)
+        try:
+            handle = await self.page.wait_for_function(
+                SIGN_READY_SCRIPT,
+                timeout=self.MNSV2_TIMEOUT,
+            )
+            ready = await handle.json_value()
+        except Exception as e:
+            logger.warning(
+                "mnsv2_not_detected",
+                instance_id=self.instance_id,
+                message="mnsv2 not detected before timeout, continuing anyway",
+                error=str(e),
+            )
+            await self._probe_mnsv2_hash()
+            await self._capture_xs_common()
+            return
 
-            except Exception as e:
-                logger.warning(
-                    "mnsv2_check_error",
-                    instance_id=self.instance_id,
-                    attempt=attempt + 1,
-                    error=str(e),
-                )
-                await asyncio.sleep(self.SIGN_CHECK_DELAY)
+        self._mnsv2_needs_hash = bool(ready["needsHash"])
+        logger.debug(
+            "mnsv2_hash_probed",
+            instance_id=self.instance_id,
+            needs_hash=self._mnsv2_needs_hash,
+        )
+        self._set_xs_common(ready["xsCommon"])
+
+    async def _probe_mnsv2_hash(self, page: Optional[Page] = None) -> None:
+        """Check whether mnsv2 on page (default: primary) reads its hash argument."""
+        page = page or self.page
+        if not page:
+            return
 
-        # Log warning but don't fail - mnsv2 might still work
-        logger.warning(
-            "mnsv2_not_detected",
+        try:
+            self._mnsv2_needs_hash = bool(
+                await page.evaluate(MNSV2_HASH_PROBE_SCRIPT)
+            )
+        except Exception as e:
+            self._mnsv2_needs_hash = True
+            logger.warning(
+                "mnsv2_hash_probe_failed",
+                instance_id=self.instance_id,
+                error=str(e),
+            )
+            return
+
+        logger.debug(
+            "mnsv2_hash_probed",
             instance_id=self.instance_id,
-            message="mnsv2 not detected after retries, continuing anyway",
+            needs_hash=self._mnsv2_needs_hash,
         )
 
-    async def _capture_xs_common(self) -> None:
-        """Capture X-S-Common header by triggering a request."""
-        if not self.page:
+    async def _capture_xs_common(self, page: Optional[Page] = None) -> None:
+        """Capture X-S-Common header from page (default: primary)."""
+        page = page or self.page
+        if not page:
             return
 
         try:
             # Get X-S-Common from window variable (captured by interceptor)
-            xs_common = await self.page.evaluate(GET_XS_COMMON_SCRIPT)
-            if xs_common:
-                self._xs_common = xs_common
-                logger.info(
-                    "xs_common_captured",
-                    instance_id=self.instance_id,
-                    length=len(self._xs_common),
-                )
-
+            xs_common = (await page.evaluate(PAGE_STATUS_SCRIPT))["xsCommon"]
         except Exception as e:
             logger.warning(
                 "xs_common_capture_failed",
                 instance_id=self.instance_id,
                 error=str(e),
             )
+            return
+
+        self._set_xs_common(xs_common)
+
+    def _set_xs_common(self, xs_common: str) -> None:
+        """Store a captured X-S-Common; a changed value voids cached signatures."""
+        if not xs_common:
+            return
+
+        if xs_common != self._xs_common:
+            self._sign_cache.clear()
+        self._xs_common = xs_common
+        logger.info(
+            "xs_common_captured",
+            instance_id=self.instance_id,
+            length=len(self._xs_common),
+        )
 
     async def _inject_cookies(self, cookies: List[Dict[str, Any]]) -> None:
         """Inject cookies into browser context."""
@@ -527,29 +1090,23 @@ class XYSSignService:
             raise CookieInjectionError("Context is None")
 
         try:
-            # Format cookies for Playwright
-            formatted_cookies = []
-            for cookie in cookies:
-                formatted_cookie = {
-                    "name": cookie.get("name"),
-                    "value": cookie.get("value"),
-                    "domain": cookie.get("domain", ".xiaohongshu.com"),
-                    "path": cookie.get("path", "/"),
-                }
-
-                # Add optional fields if present
-                if "expires" in cookie:
-                    formatted_cookie["expires"] = cookie["expires"]
-                if "httpOnly" in cookie:
-                    formatted_cookie["httpOnly"] = cookie["httpOnly"]
-                if "secure" in cookie:
-                    formatted_cookie["secure"] = cookie["secure"]
-                if "sameSite" in cookie:
-                    formatted_cookie["sameSite"] = cookie["sameSite"]
-
-                formatted_cookies.append(formatted_cookie)
+            # Format cookies for Playwright (once per cookie list)
+            if cookies is not self._formatted_cookies_source:
+                self._formatted_cookies = [
+                    {
+                        "name": cookie.get("name"),
+                        "value": cookie.get("value"),
+                        "domain": cookie.get("domain", ".xiaohongshu.com"),
+                        "path": cookie.get("path", "/"),
+                        **{k: cookie[k] for k in _OPTIONAL_COOKIE_FIELDS & cookie.keys()},
+                    }
+                    for cookie in cookies
+                ]
+                self._formatted_cookies_source = cookies
+            formatted_cookies = self._formatted_cookies
 
             await self.context.add_cookies(formatted_cookies)
+            self._cookie_cache = None
 
             logger.debug(
                 "cookies_injected",
@@ -560,32 +1117,98 @@ class XYSSignService:
         except Exception as e:
             raise CookieInjectionError(f"Failed to inject cookies: {e}")
 
-    async def _try_recover(self) -> None:
-        """Try to recover from error state by reloading page."""
+    async def _try_recover(self, page: Page) -> None:
+        """
+        Try to recover a failing signing page, cheapest step first.
+
+        Reloads the page, then re-navigates it to Creator, and only then
+        replaces it with a freshly opened page. A step counts as recovered
+        once mnsv2 is available again.
+
+        Args:
+            page: The signing page that failed (held by the caller)
+        """
         logger.info(
             "attempting_recovery",
             instance_id=self.instance_id,
             consecutive_errors=self.consecutive_errors,
         )
 
-        try:
-            await self._navigate_to_creator()
-            await self._wait_for_mnsv2()
-            await self._capture_xs_common()
-            self.consecutive_errors = 0
+        self._sign_cache.clear()
+        self._healthy_until = 0.0
 
+        steps = (
+            ("reload", self._reload_page),
+            ("navigate", self._renavigate_page),
+            ("new_page", self._replace_sign_page),
+        )
+        for step, recover in steps:
+            try:
+                page = await recover(page)
+                if not await self._wait_for_mnsv2(page):
+                    continue
+                await self._probe_mnsv2_hash(page)
+                await self._capture_xs_common(page)
+            except Exception as e:
+                logger.warning(
+                    "recovery_step_failed",
+                    instance_id=self.instance_id,
+                    step=step,
+                    error=str(e),
+                )
+                continue
+
+            self.consecutive_errors = 0
             logger.info(
                 "recovery_successful",
                 instance_id=self.instance_id,
+                step=step,
             )
+            return
 
-        except Exception as e:
-            logger.error(
-                "recovery_failed",
-                instance_id=self.instance_id,
-                error=str(e),
-            )
-            self.status = InstanceStatus.ERROR
+        logger.error(
+            "recovery_failed",
+            instance_id=self.instance_id,
+        )
+        self.status = InstanceStatus.ERROR
+
+    async def _reload_page(self, page: Page) -> Page:
+        """Reload page in place (context cookies are kept)."""
+        await page.reload(wait_until="domcontentloaded", timeout=self.PAGE_TIMEOUT)
+        return page
+
+    async def _renavigate_page(self, page: Page) -> Page:
+        """Run the full Creator navigation again on page."""
+        await self._navigate_to_creator(page)
+        return page
+
+    async def _replace_sign_page(self, page: Page) -> Page:
+        """Swap page for a freshly opened one in the signing pool.
+
+        The new page goes straight into the free queue; the caller's
+        release of the old one is then ignored.
+        """
+        new_page = await self._open_sign_page()
+        if page in self._sign_pages:
+            self._sign_pages[self._sign_pages.index(page)] = new_page
+        if page is self.page:
+            self.page = new_page
+        self._free_pages.put_nowait(new_page)
+
+        try:
+            await page.close()
+        except Exception:
+            pass
+
+        return new_page
+
+    def _last_used_iso(self) -> Optional[str]:
+        """Wall-clock time of the last signature as ISO text, or None if never used."""
+        if not self._last_used_ns:
+            return None
+        return (self.created_at + timedelta(
+            microseconds=(self._last_used_ns - self._created_ns) // 1000
+        )).isoformat()
 
     def get_stats(self) -> Dict[str, Any]:
         """Get instance statistics."""
@@ -595,8 +1218,10 @@ class XYSSignService:
             "headless": self.headless,
             "has_proxy": bool(self.proxy),
             "has_xs_common": bool(self._xs_common),
+            "pages": self.page_count,
+            "lazy": self.lazy,
             "created_at": self.created_at.isoformat(),
-            "last_used_at": self.last_used_at.isoformat() if self.last_used_at else None,
+            "last_used_at": self._last_used_iso(),
             "request_count": self.request_count,
             "error_count": self.error_count,
             "consecutive_errors": self.consecutive_errors,
@@ -606,6 +1231,11 @@ class XYSSignService:
             ),
         }
 
+    def _on_response(self, response) -> None:
+        """Drop the cookie mirror when a response sets cookies."""
+        if self._cookie_cache is not None and "set-cookie" in response.headers:
+            self._cookie_cache = None
+
     async def get_cookies(self) -> Dict[str, str]:
         """
         Get all cookies from browser context.
@@ -615,10 +1245,15 @@ class XYSSignService:
         """
         if not self.context:
             return {}
-        
+
+        if self._cookie_cache is not None and self._cookie_cache_expires > time.monotonic():
+            return dict(self._cookie_cache)
+
         try:
             cookies = await self.context.cookies()
-            return {c["name"]: c["value"] for c in cookies}
+            self._cookie_cache = {c["name"]: c["value"] for c in cookies}
+            self._cookie_cache_expires = time.monotonic() + self.COOKIE_CACHE_TTL
+            return dict(self._cookie_cache)
         except Exception as e:
             logger.warning(
                 "get_cookies_failed",